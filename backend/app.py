@@ -2,6 +2,7 @@ from fastapi import FastAPI, Depends, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, Session
+import logging
 import os
 from pathlib import Path
 from dotenv import load_dotenv
@@ -11,6 +12,13 @@ current_dir = Path(__file__).parent
 env_path = current_dir / '.env'
 load_dotenv(dotenv_path=env_path)
 
+# Service modules log through logging.getLogger(__name__); without a handler their
+# info-level progress messages would be dropped
+logging.basicConfig(
+    level=os.getenv("LOG_LEVEL", "INFO").upper(),
+    format="%(asctime)s %(levelname)s [%(threadName)s] %(name)s: %(message)s"
+)
+
 from backend.db.models import Base
 from backend.auth import router as auth_router
 from backend.routes.auth import router as google_auth_router
@@ -1,5 +1,6 @@
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
+import json
 import os
 from pathlib import Path
 from dotenv import load_dotenv
@@ -19,7 +20,23 @@ DATABASE_URL = os.getenv("DATABASE_URL")
 if not DATABASE_URL:
     raise ValueError("DATABASE_URL not found in environment variables. Check your .env file.")
 
-engine = create_engine(DATABASE_URL)
+# JSON columns (source data, section sources) go through orjson when it is installed
+try:
+    import orjson
+    
+    def _json_serializer(obj) -> str:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+    
+    _json_deserializer = orjson.loads
+except ImportError:
+    _json_serializer = json.dumps
+    _json_deserializer = json.loads
+
+engine = create_engine(
+    DATABASE_URL,
+    json_serializer=_json_serializer,
+    json_deserializer=_json_deserializer
+)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 def get_db():
@@ -82,6 +82,18 @@ class MemoRequest(Base):
     sources = relationship("Source", back_populates="memo_requests")
 
 
+class MemoSectionCache(Base):
+    __tablename__ = "memo_section_cache"
+
+    id = Column(Integer, primary_key=True, index=True)
+    cache_key = Column(String(64), unique=True, nullable=False, index=True)  # sha256 of section, model settings and prompt
+    section_name = Column(String, nullable=False)
+    model = Column(String, nullable=False)
+    content = Column(Text, nullable=False)
+    data_sources = Column(JSON)
+    created_at = Column(TIMESTAMP(timezone=True), server_default=func.now())
+
+
 # Add this to your existing models
 
 class DocumentEmbedding(Base):
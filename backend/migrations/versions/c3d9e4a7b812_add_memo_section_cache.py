@@ -0,0 +1,39 @@
+"""Add memo_section_cache table
+
+Revision ID: c3d9e4a7b812
+Revises: 75f6a5e10f86
+Create Date: 2026-10-16 10:12:41.518203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3d9e4a7b812'
+down_revision: Union[str, None] = '75f6a5e10f86'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'memo_section_cache',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('cache_key', sa.String(length=64), nullable=False),
+        sa.Column('section_name', sa.String(), nullable=False),
+        sa.Column('model', sa.String(), nullable=False),
+        sa.Column('content', sa.Text(), nullable=False),
+        sa.Column('data_sources', sa.JSON()),
+        sa.Column('created_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()')),
+    )
+    op.create_index('ix_memo_section_cache_id', 'memo_section_cache', ['id'])
+    op.create_index('ix_memo_section_cache_cache_key', 'memo_section_cache', ['cache_key'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_memo_section_cache_cache_key', table_name='memo_section_cache')
+    op.drop_index('ix_memo_section_cache_id', table_name='memo_section_cache')
+    op.drop_table('memo_section_cache')
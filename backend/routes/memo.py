@@ -9,8 +9,8 @@ from backend.db.models import User, MemoRequest, MemoSection
 from backend.database import get_db, SessionLocal
 from backend.auth import get_current_user
 from backend.services.data_gathering_service import get_stored_company_data
-from backend.services.memo_generation_service import generate_comprehensive_memo, generate_short_memo, compile_final_memo, compile_short_memo
-from backend.services.document_service import generate_word_document, generate_short_word_document, get_document_summary, generate_google_doc
+from backend.services.memo_generation_service import generate_comprehensive_memo, generate_short_memo, compile_final_memo, compile_short_memo, cancel_memo_generation, is_memo_generating
+from backend.services.document_service import generate_word_document, generate_short_word_document, get_document_summary, generate_google_doc_async
 
 #This file handles memo generation and document creation
 
@@ -34,7 +34,7 @@ class MemoResponse(BaseModel):
     status: str
     message: Optional[str] = None
 
-def generate_memo_background(company_data: Dict, memo_request_id: int, memo_type: str = "full"):
+def generate_memo_background(company_data: Dict, memo_request_id: int, memo_type: str = "full", force: bool = False):
     """Background task to generate memo sections"""
     print(f"Starting background generation for memo {memo_request_id}, type: {memo_type}")
     db = SessionLocal()
@@ -50,7 +50,8 @@ def generate_memo_background(company_data: Dict, memo_request_id: int, memo_type
             generation_result = generate_comprehensive_memo(
                 company_data, 
                 db, 
-                memo_request_id
+                memo_request_id,
+                force=force
             )
         
         print(f"Generation result: {generation_result}")
@@ -215,6 +216,82 @@ async def get_memo_status(
         "created_at": memo_request.created_at
     }
 
+@router.post("/memo/{memo_id}/cancel")
+async def cancel_memo(
+    memo_id: int,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Stop an in-progress full memo generation. Sections still being written are
+    abandoned mid-stream; finished sections are kept.
+    """
+    memo_request = db.query(MemoRequest).filter(
+        MemoRequest.id == memo_id,
+        MemoRequest.user_id == current_user.id
+    ).first()
+    
+    if not memo_request:
+        raise HTTPException(status_code=404, detail="Memo request not found")
+    
+    # Generation runs in this process's background tasks, so only this instance can stop it
+    cancelled = cancel_memo_generation(memo_id)
+    
+    return {
+        "memo_id": memo_id,
+        "cancelled": cancelled,
+        "status": memo_request.status
+    }
+
+@router.post("/memo/{memo_id}/retry")
+async def retry_memo(
+    memo_id: int,
+    background_tasks: BackgroundTasks,
+    force: bool = False,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Re-run a full memo in the background. Completed sections are kept and only the
+    failed or missing ones are generated again, unless force is set.
+    """
+    memo_request = db.query(MemoRequest).filter(
+        MemoRequest.id == memo_id,
+        MemoRequest.user_id == current_user.id
+    ).first()
+    
+    if not memo_request:
+        raise HTTPException(status_code=404, detail="Memo request not found")
+    
+    if memo_request.memo_type == "short":
+        raise HTTPException(status_code=400, detail="Only full memos can be retried")
+    
+    # A stale "in_progress" row from a crashed or restarted run can be retried
+    if is_memo_generating(memo_request.id):
+        raise HTTPException(status_code=409, detail="Memo generation is already in progress")
+    
+    company_data = get_stored_company_data(db, memo_request.sources_id)
+    if "error" in company_data:
+        raise HTTPException(status_code=404, detail=company_data["error"])
+    
+    memo_request.status = "in_progress"
+    memo_request.error_log = None
+    db.commit()
+    
+    background_tasks.add_task(
+        generate_memo_background,
+        company_data,
+        memo_request.id,
+        "full",
+        force
+    )
+    
+    return {
+        "memo_request_id": memo_request.id,
+        "status": "in_progress",
+        "message": "Memo regeneration started" if force else "Retrying failed memo sections"
+    }
+
 @router.get("/memo/list")
 async def list_user_memos(
     current_user: User = Depends(get_current_user),
@@ -287,7 +364,7 @@ async def generate_memo_document(
         sections_dict = {section.section_name: section for section in sections}
         
         # Generate Google Doc
-        doc_url = generate_google_doc(
+        doc_url = await generate_google_doc_async(
             user=current_user,
             db=db,
             sections_dict=sections_dict,
@@ -346,7 +423,7 @@ async def download_memo_document(
         sections_dict = {section.section_name: section for section in sections}
         
         # Generate Google Doc
-        doc_url = generate_google_doc(
+        doc_url = await generate_google_doc_async(
             user=current_user,
             db=db,
             sections_dict=sections_dict,
@@ -403,7 +480,7 @@ async def test_document_format(
             raise HTTPException(status_code=400, detail="Either source_id or sections must be provided")
         
         # Generate Google Doc
-        doc_url = generate_google_doc(
+        doc_url = await generate_google_doc_async(
             user=current_user,
             db=db,
             sections_dict=sections_dict,
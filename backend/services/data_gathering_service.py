@@ -2,7 +2,7 @@ from typing import Dict, Any, List
 from sqlalchemy.orm import Session
 from backend.db.models import User, Source
 from backend.services.affinity_service import get_company_details
-from backend.services.google_service import search_files, get_docs_service
+from backend.services.google_service import search_files, get_docs_service, GOOGLE_API_RETRIES
 from backend.services.perplexity_service import search_company_comprehensive
 
 import os
@@ -73,9 +73,11 @@ def gather_drive_data(user: User, db: Session, company_name: str) -> Dict[str, A
             # Try to extract content from Google Docs
             if file.get("mimeType") == "application/vnd.google-apps.document":
                 try:
+                    # Only the paragraph text runs are read by extract_text_from_doc
                     doc_content = docs_service.documents().get(
-                        documentId=file["id"]
-                    ).execute()
+                        documentId=file["id"],
+                        fields="body/content/paragraph/elements/textRun/content"
+                    ).execute(num_retries=GOOGLE_API_RETRIES)
                     file_data["content"] = extract_text_from_doc(doc_content)
                 except Exception as e:
                     file_data["content_error"] = str(e)
@@ -1,106 +1,201 @@
+from __future__ import annotations
+
+import asyncio
+import io
 import os
 from typing import Dict, Any, List, Optional, Tuple
+from sqlalchemy import and_
 from sqlalchemy.orm import Session
-from docx import Document
-from docx.shared import Inches, Pt
-from docx.enum.text import WD_ALIGN_PARAGRAPH
-from docx.enum.style import WD_STYLE_TYPE
-from docx.enum.table import WD_TABLE_ALIGNMENT
-from docx.oxml.shared import OxmlElement, qn
 from datetime import datetime
+from copy import deepcopy
+from functools import lru_cache
+from itertools import islice
 import tempfile
+import logging
 import re
 
-from docx.shared import Inches, Pt, RGBColor
-from docx.oxml import OxmlElement
-from docx.oxml.ns import qn
-
 
 from backend.db.models import MemoRequest, MemoSection
 
+logger = logging.getLogger(__name__)
+
+# python-docx (and lxml underneath it) is only needed for Word output, so it is
+# imported on first use by _load_docx(). The Google Docs path never loads it.
+Document = Inches = Pt = RGBColor = None
+WD_ALIGN_PARAGRAPH = WD_STYLE_TYPE = WD_TABLE_ALIGNMENT = None
+OxmlElement = qn = None
+
+# Shared lengths and colors, built once instead of inside per-row/per-run loops
+_PT_0 = _PT_3 = _PT_4 = _PT_6 = _PT_8 = _PT_10 = _PT_11 = _PT_12 = _PT_14 = _PT_18 = _PT_24 = None
+_IN_025 = _IN_04 = _IN_06 = None
+_RGB_WHITE = _RGB_BLACK = None
+
+# Pre-resolved namespaced attribute names for hot XML writes
+_QN_W = _QN_TYPE = _QN_FILL = _QN_VAL = _QN_ASCII = _QN_HANSI = None
+
+# Prototype cell margin / shading elements cloned per table cell
+_TCMAR_PROTOTYPE = _SHD_PROTOTYPE = None
+
+# Lines starting with ##, ### or #### (leading indentation allowed)
+_HEADER_LINE_RE = re.compile(r'(?m)^[ \t]*#{2,4}[^\n]*\n?')
+
+# Leading hash markers on a header line
+_HASH_PREFIX = re.compile(r'^#+\s*')
+
+# Blank-line runs collapsed to a single paragraph break
+_NL_NORM = re.compile(r'\n\s*\n')
+
+# Inline **bold** markers
+_BOLD_RE = re.compile(r'\*\*([^*]+)\*\*')
+
+# Table cleanup: hash markers, then **bold** markers (_BOLD_RE, text kept), then
+# line-leading bullets. The passes stay separate and in this order because each can
+# expose text for the next (e.g. '## - item' only has a line-start bullet once '## ' is gone)
+_HASH_MARKERS = re.compile(r'#+\s*')
+_LINE_BULLETS = re.compile(r'^[•\-]\s*', re.MULTILINE)
+_WS_RUN = re.compile(r'\s+')
+_SENTENCE_SPLIT = re.compile(r'[.!?]+')
+
+# A line containing at least one non-whitespace character
+_NONBLANK_LINE = re.compile(r'[^\n]*\S[^\n]*')
+
+# Hash markers anywhere in a line (short memo cleanup)
+_HASH_RUN = re.compile(r'#+\s*')
+
+# Leftover markdown artifacts: backticks, tildes, underscores
+_STRIP_CHARS = str.maketrans('', '', '`~_')
+
+# Output directories for generated Word documents (created on first use)
+_DOCS_DIR = os.path.join(os.path.dirname(__file__), '..', '..', 'generated_docs')
+_SHORT_DOCS_DIR = os.path.join(os.path.dirname(__file__), '..', '..', 'generated_documents')
+
+# Company name -> filename-safe fragment
+_FILENAME_SAFE = str.maketrans({' ': '_', '/': '_'})
+
+# Display order and titles for the main memo sections
+_SECTION_ORDER = (
+    ("executive_summary", "Executive Summary"),
+    ("company_snapshot", "Company Snapshot"),
+    ("people", "Team & Leadership"),
+    ("market_opportunity", "Market Opportunity"),
+    ("competitive_landscape", "Competitive Landscape"),
+    ("product", "Product & Technology"),
+    ("financial", "Financial Analysis"),
+    ("traction_validation", "Traction & Validation"),
+    ("deal_considerations", "Deal Considerations"),
+)
+
+# Assessment categories mapping
+_ASSESSMENT_MAPPING = (
+    ("assessment_people", "Team & Leadership"),
+    ("assessment_market_opportunity", "Market Opportunity"),
+    ("assessment_product", "Product & Technology"),
+    ("assessment_financials", "Financial Health"),
+    ("assessment_traction_validation", "Traction & Validation"),
+    ("assessment_deal_considerations", "Deal Structure"),
+)
+
+# Google Doc header blocks; title content is filled in per document
+_GOOGLE_DOC_HEADER_TEMPLATE = (
+    {'type': 'title', 'content': '{company} - {date}'},
+    {'type': 'subtitle', 'content': 'Series A Memo'},
+    {'type': 'subtitle', 'content': 'Deal Team: [To Be Determined]'},  # Placeholder for now
+    {'type': 'paragraph', 'content': ''},  # Spacing
+)
+
 def create_memo_styles(doc: Document):
     """Create custom styles for the memo document"""
+    _load_docx()
     
     styles = doc.styles
     
     # Choose your font here - change this to whatever you want
     DOCUMENT_FONT = 'Bangla Sangam MN'  
     
+    # Collect existing style names once instead of rescanning per check
+    existing = {s.name for s in styles}
+    
     # Title style
-    if 'Memo Title' not in [s.name for s in styles]:
+    if 'Memo Title' not in existing:
         title_style = styles.add_style('Memo Title', WD_STYLE_TYPE.PARAGRAPH)
+        existing.add('Memo Title')
         title_font = title_style.font
         title_font.name = DOCUMENT_FONT
-        title_font.size = Pt(14)
+        title_font.size = _PT_14
         title_font.bold = True
         title_style.paragraph_format.alignment = WD_ALIGN_PARAGRAPH.CENTER
-        title_style.paragraph_format.space_after = Pt(14)
+        title_style.paragraph_format.space_after = _PT_14
     
     # Company name style
-    if 'Company Name' not in [s.name for s in styles]:
+    if 'Company Name' not in existing:
         company_style = styles.add_style('Company Name', WD_STYLE_TYPE.PARAGRAPH)
+        existing.add('Company Name')
         company_font = company_style.font
         company_font.name = DOCUMENT_FONT
-        company_font.size = Pt(12)
+        company_font.size = _PT_12
         company_font.bold = True
         company_style.paragraph_format.alignment = WD_ALIGN_PARAGRAPH.CENTER
-        company_style.paragraph_format.space_after = Pt(12)
+        company_style.paragraph_format.space_after = _PT_12
     
     # Section heading style
-    if 'Section Heading' not in [s.name for s in styles]:
+    if 'Section Heading' not in existing:
         heading_style = styles.add_style('Section Heading', WD_STYLE_TYPE.PARAGRAPH)
+        existing.add('Section Heading')
         heading_font = heading_style.font
         heading_font.name = DOCUMENT_FONT
-        heading_font.size = Pt(12)
+        heading_font.size = _PT_12
         heading_font.bold = True
         heading_font.color.rgb = None 
-        heading_style.paragraph_format.space_before = Pt(18)  
-        heading_style.paragraph_format.space_after = Pt(12)   
+        heading_style.paragraph_format.space_before = _PT_18  
+        heading_style.paragraph_format.space_after = _PT_12   
     
     # Subsection heading style
-    if 'Subsection Heading' not in [s.name for s in styles]:
+    if 'Subsection Heading' not in existing:
         sub_heading_style = styles.add_style('Subsection Heading', WD_STYLE_TYPE.PARAGRAPH)
+        existing.add('Subsection Heading')
         sub_heading_font = sub_heading_style.font
         sub_heading_font.name = DOCUMENT_FONT
-        sub_heading_font.size = Pt(10)
+        sub_heading_font.size = _PT_10
         sub_heading_font.bold = True
-        sub_heading_style.paragraph_format.space_before = Pt(12)
-        sub_heading_style.paragraph_format.space_after = Pt(8)
+        sub_heading_style.paragraph_format.space_before = _PT_12
+        sub_heading_style.paragraph_format.space_after = _PT_8
     
     # Assessment table heading style 
-    if 'Assessment Table Heading' not in [s.name for s in styles]:
+    if 'Assessment Table Heading' not in existing:
         assessment_table_style = styles.add_style('Assessment Table Heading', WD_STYLE_TYPE.PARAGRAPH)
+        existing.add('Assessment Table Heading')
         assessment_table_font = assessment_table_style.font
         assessment_table_font.name = DOCUMENT_FONT
-        assessment_table_font.size = Pt(12)  
+        assessment_table_font.size = _PT_12  
         assessment_table_font.bold = True
-        assessment_table_style.paragraph_format.space_before = Pt(24) 
-        assessment_table_style.paragraph_format.space_after = Pt(12)  
+        assessment_table_style.paragraph_format.space_before = _PT_24 
+        assessment_table_style.paragraph_format.space_after = _PT_12  
     
     # Body text style
-    if 'Memo Body' not in [s.name for s in styles]:
+    if 'Memo Body' not in existing:
         body_style = styles.add_style('Memo Body', WD_STYLE_TYPE.PARAGRAPH)
+        existing.add('Memo Body')
         body_font = body_style.font
         body_font.name = DOCUMENT_FONT
-        body_font.size = Pt(10)
+        body_font.size = _PT_10
         body_style.paragraph_format.line_spacing = 1.2  
-        body_style.paragraph_format.space_after = Pt(8) 
+        body_style.paragraph_format.space_after = _PT_8 
     
     # List Bullet style 
     try:
         list_bullet_style = styles['List Bullet']
         list_bullet_font = list_bullet_style.font
         list_bullet_font.name = DOCUMENT_FONT
-        list_bullet_font.size = Pt(10)
-        list_bullet_style.paragraph_format.space_after = Pt(4) 
+        list_bullet_font.size = _PT_10
+        list_bullet_style.paragraph_format.space_after = _PT_4 
     except KeyError:
         # Create List Bullet style if it doesn't exist
         list_bullet_style = styles.add_style('List Bullet', WD_STYLE_TYPE.PARAGRAPH)
         list_bullet_font = list_bullet_style.font
         list_bullet_font.name = DOCUMENT_FONT
-        list_bullet_font.size = Pt(10)
-        list_bullet_style.paragraph_format.left_indent = Inches(0.25)
-        list_bullet_style.paragraph_format.space_after = Pt(4)  
+        list_bullet_font.size = _PT_10
+        list_bullet_style.paragraph_format.left_indent = _IN_025
+        list_bullet_style.paragraph_format.space_after = _PT_4  
         list_bullet_style.paragraph_format.line_spacing = 1.2 
 
 def clean_markdown_formatting(content: str, section_name: str) -> str:
@@ -111,13 +206,7 @@ def clean_markdown_formatting(content: str, section_name: str) -> str:
     # This is because these sections should be concise summaries without subheaders
     if section_name in ['executive_summary', 'company_snapshot']:
         # Remove lines that start with ##, ###, or ####
-        lines = content.split('\n')
-        cleaned_lines = []
-        for line in lines:
-            stripped_line = line.strip()
-            if not (stripped_line.startswith('####') or stripped_line.startswith('###') or stripped_line.startswith('##')):
-                cleaned_lines.append(line)
-        content = '\n'.join(cleaned_lines)
+        content = _HEADER_LINE_RE.sub('', content)
     
     # Remove extra whitespace and normalize line breaks
     content = re.sub(r'\n\s*\n\s*\n', '\n\n', content)  # Max 2 consecutive line breaks
@@ -125,60 +214,43 @@ def clean_markdown_formatting(content: str, section_name: str) -> str:
     
     return content
 
-def parse_formatted_content(content: str, section_name: str) -> List[Dict[str, Any]]:
-    """
-    Simple parser: Split content into lines and process basic formatting.
-    - Lines starting with #, ##, ###, #### -> bold header (10pt, bold)
-    - Lines with **text** -> paragraph with inline bold
-    - Everything else -> regular paragraph (10pt, not bold)
-    """
-    import re
-    content_blocks = []
-    lines = content.split('\n')
-    
-    for line in lines:
-        stripped = line.strip()
-        
-        if not stripped:
-            # Empty line - add spacing
-            content_blocks.append({'type': 'paragraph', 'content': ''})
-        elif stripped.startswith('#'):
-            # Hash pattern at line start -> bold header (10pt, bold)
-            text = re.sub(r'^#+\s*', '', stripped)
-            if text:
-                content_blocks.append({
-                    'type': 'bold_header',
-                    'content': text
-                })
-        else:
-            # Regular paragraph - check for inline **text** patterns
-            content_blocks.append({
-                'type': 'paragraph',
-                'content': line
-            })
-    
-    return content_blocks
-
-def add_formatted_text_to_paragraph(paragraph, text: str, font_name: str = 'Bangla Sangam MN', font_size: int = 10):
+def add_formatted_text_to_paragraph(paragraph, text: str, font_name: str = 'Bangla Sangam MN', font_size: int = 10,
+                                    bold_ranges: Optional[List[Tuple[int, int]]] = None):
     """
-    Add text to a paragraph with proper bold formatting for **text** and consistent font
+    Add text to a paragraph with proper bold formatting for **text** and consistent font.
+    If bold_ranges (from process_markdown_bold) is given, text is treated as already
+    cleaned and runs are cut by index instead of re-parsing the markers.
     """
-    # Split text by bold markers
-    parts = re.split(r'\*\*([^*]+)\*\*', text)
-    
-    for i, part in enumerate(parts):
+    _load_docx()
+    if bold_ranges is not None:
+        segments = []
+        cursor = 0
+        for bold_start, bold_end in bold_ranges:
+            # Only slice plain text when there is a gap before this bold range
+            if cursor < bold_start:
+                segments.append((text[cursor:bold_start], False))
+            segments.append((text[bold_start:bold_end], True))
+            cursor = bold_end
+        if cursor < len(text):
+            segments.append((text[cursor:], False))
+    elif '**' not in text:
+        # Common case: no bold markers, so skip the regex entirely
+        segments = [(text, False)]
+    else:
+        # Split text by bold markers - odd indices hold the content between **
+        parts = _BOLD_RE.split(text)
+        segments = [(part, i % 2 == 1) for i, part in enumerate(parts)]
+    
+    size = Pt(font_size)
+    for part, is_bold in segments:
         if not part:  # Skip empty parts
             continue
-            
-        if i % 2 == 0:  # Regular text (even indices)
-            run = paragraph.add_run(part)
-            run.font.name = font_name
-            run.font.size = Pt(font_size)
-        else:  # Bold text (odd indices, content between **)
-            run = paragraph.add_run(part)
+        
+        run = paragraph.add_run(part)
+        if is_bold:
             run.bold = True
-            run.font.name = font_name
-            run.font.size = Pt(font_size)
+        run.font.name = font_name
+        run.font.size = size
 
 def extract_rating_from_content(content: str) -> Tuple[Optional[str], str]:
     """
@@ -208,13 +280,90 @@ def extract_rating_from_content(content: str) -> Tuple[Optional[str], str]:
         cleaned_content = re.sub(pattern, '', cleaned_content, flags=re.IGNORECASE)
     
     # Clean up extra whitespace and formatting
-    cleaned_content = re.sub(r'\n\s*\n', '\n\n', cleaned_content)
-    cleaned_content = cleaned_content.strip()
+    cleaned_content = _NL_NORM.sub('\n\n', cleaned_content).strip()
     
     return rating, cleaned_content
 
+def _make_tcmar_prototype():
+    """Build the canonical w:tcMar element used for assessment table cells"""
+    tc_mar = OxmlElement('w:tcMar')
+    # Set margins: top, left, bottom, right (in twentieths of a point)
+    for margin_name in ('top', 'left', 'bottom', 'right'):
+        margin_elem = OxmlElement(f'w:{margin_name}')
+        margin_elem.set(_QN_W, '120')
+        margin_elem.set(_QN_TYPE, 'dxa')
+        tc_mar.append(margin_elem)
+    return tc_mar
+
+@lru_cache(maxsize=None)
+def _load_docx():
+    """Import python-docx and build the shared docx constants on first use"""
+    global Document, Inches, Pt, RGBColor, WD_ALIGN_PARAGRAPH, WD_STYLE_TYPE, WD_TABLE_ALIGNMENT
+    global OxmlElement, qn
+    global _PT_0, _PT_3, _PT_4, _PT_6, _PT_8, _PT_10, _PT_11, _PT_12, _PT_14, _PT_18, _PT_24, _IN_025, _IN_04, _IN_06, _RGB_WHITE, _RGB_BLACK
+    global _QN_W, _QN_TYPE, _QN_FILL, _QN_VAL, _QN_ASCII, _QN_HANSI, _TCMAR_PROTOTYPE, _SHD_PROTOTYPE
+
+    from docx import Document
+    from docx.shared import Inches, Pt, RGBColor
+    from docx.enum.text import WD_ALIGN_PARAGRAPH
+    from docx.enum.style import WD_STYLE_TYPE
+    from docx.enum.table import WD_TABLE_ALIGNMENT
+    from docx.oxml import OxmlElement
+    from docx.oxml.ns import qn
+
+    _PT_0, _PT_3, _PT_4, _PT_6 = Pt(0), Pt(3), Pt(4), Pt(6)
+    _PT_8, _PT_10, _PT_11, _PT_12 = Pt(8), Pt(10), Pt(11), Pt(12)
+    _PT_14, _PT_18, _PT_24 = Pt(14), Pt(18), Pt(24)
+    _IN_025, _IN_04, _IN_06 = Inches(0.25), Inches(0.4), Inches(0.6)
+    _RGB_WHITE = RGBColor(255, 255, 255)
+    _RGB_BLACK = RGBColor(0, 0, 0)
+
+    _QN_W = qn('w:w')
+    _QN_TYPE = qn('w:type')
+    _QN_FILL = qn('w:fill')
+    _QN_VAL = qn('w:val')
+    _QN_ASCII = qn('w:ascii')
+    _QN_HANSI = qn('w:hAnsi')
+
+    _TCMAR_PROTOTYPE = _make_tcmar_prototype()
+    _SHD_PROTOTYPE = OxmlElement('w:shd')
+
+def _build_tcmar():
+    """Return a fresh copy of the standard cell margin element"""
+    return deepcopy(_TCMAR_PROTOTYPE)
+
+def _build_shd(fill: str):
+    """Return a fresh cell shading element with the given fill color"""
+    shd = deepcopy(_SHD_PROTOTYPE)
+    shd.set(_QN_FILL, fill)
+    return shd
+
+def _set_cell_text(cell, text: str, font_name: str, size, bold: bool = False, rgb=None):
+    """
+    Replace a cell's content with a single formatted run, writing the run
+    properties as XML in one go instead of setting cell.text and re-walking
+    every paragraph/run to format it. Returns the cell's paragraph.
+    """
+    tc = cell._tc
+    tc.clear_content()
+    run = tc.add_p().add_r()
+    
+    # rPr children must follow schema order: rFonts, b, color, sz
+    r_pr = OxmlElement('w:rPr')
+    r_pr.append(OxmlElement('w:rFonts', {_QN_ASCII: font_name, _QN_HANSI: font_name}))
+    if bold:
+        r_pr.append(OxmlElement('w:b'))
+    if rgb is not None:
+        r_pr.append(OxmlElement('w:color', {_QN_VAL: str(rgb)}))
+    r_pr.append(OxmlElement('w:sz', {_QN_VAL: str(int(size.pt * 2))}))  # Half-points
+    run.append(r_pr)
+    
+    run.text = text  # Line breaks become <w:br/>, same as cell.text
+    return cell.paragraphs[0]
+
 def create_assessment_table(doc: Document, assessment_sections: Dict[str, MemoSection]):
     """Create a professional assessment summary table with improved spacing"""
+    _load_docx()
     
     # Set the font for table content - consistent with document
     TABLE_FONT = 'Bangla Sangam MN'
@@ -224,7 +373,7 @@ def create_assessment_table(doc: Document, assessment_sections: Dict[str, MemoSe
     
     # Add table heading with better spacing
     table_heading = doc.add_paragraph("Investment Assessment Summary", style='Assessment Table Heading')
-    table_heading.paragraph_format.space_after = Pt(12)  # More space after heading
+    table_heading.paragraph_format.space_after = _PT_12  # More space after heading
     
     # Create table with 3 columns: Category, Rating, Key Points
     table = doc.add_table(rows=1, cols=3)
@@ -238,56 +387,24 @@ def create_assessment_table(doc: Document, assessment_sections: Dict[str, MemoSe
     
     # Set table margins and spacing
     for row in table.rows:
-        row.height = Inches(0.4)  # Minimum row height for better spacing
+        row.height = _IN_04  # Minimum row height for better spacing
         
-    # Header row
+    # Header row with gray background and white bold text
     header_cells = table.rows[0].cells
-    header_cells[0].text = "Assessment Category"
-    header_cells[1].text = "Rating"
-    header_cells[2].text = "Key Points"
-    
-    # Format header row with gray background and white text
-    for cell in header_cells:
+    for cell, header_text in zip(header_cells, ("Assessment Category", "Rating", "Key Points")):
+        paragraph = _set_cell_text(cell, header_text, TABLE_FONT, _PT_10, bold=True, rgb=_RGB_WHITE)
+        paragraph.alignment = WD_ALIGN_PARAGRAPH.LEFT
+        paragraph.paragraph_format.space_after = _PT_0  # Remove extra paragraph spacing
+        
         # Set background color using proper XML method
         tc_pr = cell._tc.get_or_add_tcPr()
-        shd = OxmlElement('w:shd')
-        shd.set(qn('w:fill'), "434343")  # Gray background
-        tc_pr.append(shd)
+        tc_pr.append(_build_shd("434343"))  # Gray background
         
         # Add cell margins for better spacing
-        tc_mar = OxmlElement('w:tcMar')
-        
-        # Set margins: top, left, bottom, right (in twentieths of a point)
-        for margin_name, margin_value in [('top', '120'), ('left', '120'), ('bottom', '120'), ('right', '120')]:
-            margin_elem = OxmlElement(f'w:{margin_name}')
-            margin_elem.set(qn('w:w'), margin_value)
-            margin_elem.set(qn('w:type'), 'dxa')
-            tc_mar.append(margin_elem)
-        
-        tc_pr.append(tc_mar)
-        
-        # Format text - white and bold
-        for paragraph in cell.paragraphs:
-            paragraph.alignment = WD_ALIGN_PARAGRAPH.LEFT
-            paragraph.paragraph_format.space_after = Pt(0)  # Remove extra paragraph spacing
-            for run in paragraph.runs:
-                run.font.name = TABLE_FONT
-                run.font.bold = True
-                run.font.size = Pt(10)
-                run.font.color.rgb = RGBColor(255, 255, 255)  # White text
-    
-    # Assessment categories mapping
-    assessment_mapping = {
-        "assessment_people": "Team & Leadership",
-        "assessment_market_opportunity": "Market Opportunity", 
-        "assessment_product": "Product & Technology",
-        "assessment_financials": "Financial Health",
-        "assessment_traction_validation": "Traction & Validation",
-        "assessment_deal_considerations": "Deal Structure"
-    }
+        tc_pr.append(_build_tcmar())
     
     # Add rows for each assessment
-    for section_key, section_title in assessment_mapping.items():
+    for section_key, section_title in _ASSESSMENT_MAPPING:
         if section_key in assessment_sections:
             section = assessment_sections[section_key]
             
@@ -298,79 +415,33 @@ def create_assessment_table(doc: Document, assessment_sections: Dict[str, MemoSe
             row_cells = table.add_row().cells
             
             # Set minimum row height for better spacing
-            table.rows[-1].height = Inches(0.6)  # Taller rows for content
+            table.rows[-1].height = _IN_06  # Taller rows for content
             
-            # Category name (first column) with light green background
-            row_cells[0].text = section_title
+            # Category name (first column), bold black text on light green background
+            paragraph = _set_cell_text(row_cells[0], section_title, TABLE_FONT, _PT_10, bold=True, rgb=_RGB_BLACK)
+            paragraph.paragraph_format.space_after = _PT_0
             
-            # Set light green background for category cell
             tc_pr = row_cells[0]._tc.get_or_add_tcPr()
-            shd = OxmlElement('w:shd')
-            shd.set(qn('w:fill'), "a6ddce")  # Light green background
-            tc_pr.append(shd)
+            tc_pr.append(_build_shd("a6ddce"))  # Light green background
             
             # Add cell margins for category cell
-            tc_mar = OxmlElement('w:tcMar')
-            for margin_name, margin_value in [('top', '120'), ('left', '120'), ('bottom', '120'), ('right', '120')]:
-                margin_elem = OxmlElement(f'w:{margin_name}')
-                margin_elem.set(qn('w:w'), margin_value)
-                margin_elem.set(qn('w:type'), 'dxa')
-                tc_mar.append(margin_elem)
-            tc_pr.append(tc_mar)
-            
-            # Format category cell text
-            for paragraph in row_cells[0].paragraphs:
-                paragraph.paragraph_format.space_after = Pt(0)
-                for run in paragraph.runs:
-                    run.font.name = TABLE_FONT
-                    run.font.bold = True
-                    run.font.size = Pt(10)
-                    run.font.color.rgb = RGBColor(0, 0, 0)  # Black text
+            tc_pr.append(_build_tcmar())
             
-            # Rating (second column) - add margins
+            # Rating (second column) - bold, centered, with margins
             rating_text = rating if rating else "N/A"
-            row_cells[1].text = rating_text
-            row_cells[1].paragraphs[0].alignment = WD_ALIGN_PARAGRAPH.CENTER
+            paragraph = _set_cell_text(row_cells[1], rating_text, TABLE_FONT, _PT_10, bold=True)
+            paragraph.alignment = WD_ALIGN_PARAGRAPH.CENTER
+            paragraph.paragraph_format.space_after = _PT_0
             
-            # Add margins to rating cell
-            tc_pr_rating = row_cells[1]._tc.get_or_add_tcPr()
-            tc_mar_rating = OxmlElement('w:tcMar')
-            for margin_name, margin_value in [('top', '120'), ('left', '120'), ('bottom', '120'), ('right', '120')]:
-                margin_elem = OxmlElement(f'w:{margin_name}')
-                margin_elem.set(qn('w:w'), margin_value)
-                margin_elem.set(qn('w:type'), 'dxa')
-                tc_mar_rating.append(margin_elem)
-            tc_pr_rating.append(tc_mar_rating)
-            
-            # Format rating cell
-            for paragraph in row_cells[1].paragraphs:
-                paragraph.paragraph_format.space_after = Pt(0)
-                for run in paragraph.runs:
-                    run.font.name = TABLE_FONT
-                    run.font.bold = True
-                    run.font.size = Pt(10)
+            row_cells[1]._tc.get_or_add_tcPr().append(_build_tcmar())
             
             # Key points (third column) - add margins and better bullet spacing
             key_points = summarize_assessment_content_with_spacing(cleaned_content)
-            row_cells[2].text = key_points
-            
-            # Add margins to key points cell
-            tc_pr_points = row_cells[2]._tc.get_or_add_tcPr()
-            tc_mar_points = OxmlElement('w:tcMar')
-            for margin_name, margin_value in [('top', '120'), ('left', '120'), ('bottom', '120'), ('right', '120')]:
-                margin_elem = OxmlElement(f'w:{margin_name}')
-                margin_elem.set(qn('w:w'), margin_value)
-                margin_elem.set(qn('w:type'), 'dxa')
-                tc_mar_points.append(margin_elem)
-            tc_pr_points.append(tc_mar_points)
+            paragraph = _set_cell_text(row_cells[2], key_points, TABLE_FONT, _PT_10)
+            paragraph.paragraph_format.space_after = _PT_3  # Small spacing between bullet lines
+            paragraph.paragraph_format.line_spacing = 1.2  # Better line spacing
             
-            # Format key points cell
-            for paragraph in row_cells[2].paragraphs:
-                paragraph.paragraph_format.space_after = Pt(3)  # Small spacing between bullet lines
-                paragraph.paragraph_format.line_spacing = 1.2  # Better line spacing
-                for run in paragraph.runs:
-                    run.font.name = TABLE_FONT
-                    run.font.size = Pt(10)
+            row_cells[2]._tc.get_or_add_tcPr().append(_build_tcmar())
     
     # Add spacing after table
     doc.add_paragraph()  # Extra spacing below table
@@ -382,29 +453,25 @@ def summarize_assessment_content_with_spacing(content: str) -> str:
     # Clean the content first
     cleaned_content = clean_table_content(content)
     
-    # Split content into sentences/points
-    sentences = re.split(r'[.!?]+', cleaned_content)
-    sentences = [s.strip() for s in sentences if s.strip() and len(s.strip()) > 10]
+    # Split content into sentences/points, keeping only the first 3 candidates
+    stripped = (sentence.strip() for sentence in _SENTENCE_SPLIT.split(cleaned_content))
+    sentences = list(islice((sentence for sentence in stripped if len(sentence) > 10), 3))
     
-    # Take first few key sentences and format as bullet points
-    key_points = []
-    for sentence in sentences[:3]:  # Take up to 3 key points
-        if len(sentence) > 20:  # Only meaningful sentences
-            sentence = sentence.strip()
-            if not sentence.endswith('.'):
-                sentence += '.'
-            key_points.append(f"• {sentence}")
+    # Format meaningful sentences as bullet points (the split already removed
+    # terminal punctuation, so every point gets a period)
+    key_points = [f"• {sentence}." for sentence in sentences if len(sentence) > 20]
     
     # If we have fewer than 2 points, try to extract from original bullet points
     if len(key_points) < 2:
         # Look for sentences that might be key points
-        lines = cleaned_content.split('\n')
-        for line in lines:
-            clean_line = line.strip()
-            if len(clean_line) > 15 and clean_line not in [kp[2:] for kp in key_points]:
+        seen = {kp[2:] for kp in key_points}
+        candidates = (line.strip() for line in cleaned_content.split('\n'))
+        for clean_line in (line for line in candidates if len(line) > 15):
+            if clean_line not in seen:
                 if not clean_line.endswith('.'):
                     clean_line += '.'
                 key_points.append(f"• {clean_line}")
+                seen.add(clean_line)
                 if len(key_points) >= 3:
                     break
     
@@ -416,26 +483,26 @@ def clean_table_content(content: str) -> str:
     Thoroughly clean content for table display - remove all markdown formatting
     """
     # Remove all hash markers (# ## ### #### etc.)
-    content = re.sub(r'#+\s*', '', content)
+    content = _HASH_MARKERS.sub('', content)
     
     # Remove bold markers but keep the text
-    content = re.sub(r'\*\*([^*]+)\*\*', r'\1', content)
+    content = _BOLD_RE.sub(r'\1', content)
     
     # Remove bullet point markers at start of lines (we'll add our own)
-    content = re.sub(r'^[•\-]\s*', '', content, flags=re.MULTILINE)
+    content = _LINE_BULLETS.sub('', content)
     
-    # Clean up multiple spaces and line breaks
-    content = re.sub(r'\s+', ' ', content)  # Multiple spaces to single space
-    content = re.sub(r'\n\s*\n', '\n', content)  # Multiple line breaks to single
+    # Collapse all whitespace runs, line breaks included, to a single space
+    content = _WS_RUN.sub(' ', content)
     
     # Remove any remaining markdown artifacts
-    content = re.sub(r'[`~_]', '', content)  # Remove backticks, tildes, underscores
+    content = content.translate(_STRIP_CHARS)  # Remove backticks, tildes, underscores
     
     return content.strip()
 
 
 def add_header_footer(doc: Document, company_name: str, generation_date: str):
     """Add header and footer to the document"""
+    _load_docx()
     
     HEADER_FOOTER_FONT = 'Bangla Sangam MN'  # Change this to match your preferred font
     
@@ -448,7 +515,7 @@ def add_header_footer(doc: Document, company_name: str, generation_date: str):
     # Format header font
     for run in header_para.runs:
         run.font.name = HEADER_FOOTER_FONT
-        run.font.size = Pt(8)
+        run.font.size = _PT_8
     
     # Add footer
     footer = doc.sections[0].footer
@@ -459,7 +526,7 @@ def add_header_footer(doc: Document, company_name: str, generation_date: str):
     # Format footer font
     for run in footer_para.runs:
         run.font.name = HEADER_FOOTER_FONT
-        run.font.size = Pt(8)
+        run.font.size = _PT_8
 
 def process_markdown_bold(text: str) -> Tuple[str, List[Tuple[int, int]]]:
     """
@@ -469,11 +536,10 @@ def process_markdown_bold(text: str) -> Tuple[str, List[Tuple[int, int]]]:
     Returns:
         (cleaned_text, bold_ranges) where bold_ranges is a list of (start, end) tuples
     """
-    import re
     bold_ranges = []
     
     # Find all matches in original text
-    matches = list(re.finditer(r'\*\*([^*]+)\*\*', text))
+    matches = list(_BOLD_RE.finditer(text))
     
     if not matches:
         return text, []
@@ -505,48 +571,64 @@ def process_markdown_bold(text: str) -> Tuple[str, List[Tuple[int, int]]]:
     # Add remaining text after last match
     cleaned_text += text[current_pos:]
     
-    # Sort ranges by start position (should already be sorted)
-    bold_ranges.sort(key=lambda x: x[0])
-    
+    # finditer yields matches left to right, so bold_ranges is already sorted by start
     return cleaned_text, bold_ranges
 
 def format_section_content(content: str, section_name: str) -> List[Dict[str, Any]]:
     """
-    Simple formatter: Process content into blocks with basic formatting.
+    Simple formatter: Process content into blocks with basic formatting in a single pass.
+    - Lines starting with #, ##, ###, #### -> bold header (10pt, bold)
+    - Lines with **text** -> paragraph with inline bold ranges
+    - Everything else -> regular paragraph (10pt, not bold)
     """
-    content_blocks = parse_formatted_content(content, section_name)
+    if not content or not content.strip():
+        return []
+    
     formatted_blocks = []
     
-    for block in content_blocks:
-        if block['type'] == 'paragraph':
-            text = block['content']
+    for line in content.split('\n'):
+        stripped = line.strip()
+        
+        if not stripped:
+            # Empty line - add spacing
+            formatted_blocks.append({'type': 'paragraph', 'content': '', 'bold_ranges': []})
+        elif stripped.startswith('#'):
+            # Hash pattern at line start -> bold header (10pt, bold)
+            text = _HASH_PREFIX.sub('', stripped)
+            if text:
+                formatted_blocks.append({
+                    'type': 'bold_header',
+                    'content': text
+                })
+        else:
             # Process inline **text** patterns for bold
-            cleaned_text, bold_ranges = process_markdown_bold(text)
+            cleaned_text, bold_ranges = process_markdown_bold(line)
             formatted_blocks.append({
                 'type': 'paragraph',
                 'content': cleaned_text,
                 'bold_ranges': bold_ranges
             })
-        else:
-            # Pass through other block types (bold_header, etc.)
-            formatted_blocks.append(block)
     
     return formatted_blocks
 
-def add_section_to_document(doc: Document, section_name: str, content: str, section_order: Dict[str, str]):
+def add_section_to_document(doc: Document, section_name: str, content: str, section_title: Optional[str] = None):
     """Add a section to the Word document with enhanced formatting"""
+    _load_docx()
     
     BODY_FONT = 'Bangla Sangam MN'  # Consistent font for all body text
     BODY_SIZE = 10
     
-    # Get section title
-    section_title = section_order.get(section_name, section_name.replace('_', ' ').title())
+    # Fall back to a title derived from the section key
+    if not section_title:
+        section_title = section_name.replace('_', ' ').title()
     
     # Add section heading
     heading_para = doc.add_paragraph(section_title, style='Section Heading')
     
     # Format and add content with enhanced parsing
     formatted_blocks = format_section_content(content, section_name)
+    if not formatted_blocks:
+        return
     
     for block in formatted_blocks:
         if block['type'] == 'subsection_header':
@@ -556,7 +638,8 @@ def add_section_to_document(doc: Document, section_name: str, content: str, sect
         elif block['type'] == 'paragraph':
             # Add paragraph with bold formatting (#### becomes **bold** within paragraph)
             para = doc.add_paragraph(style='Memo Body')
-            add_formatted_text_to_paragraph(para, block['content'], BODY_FONT, BODY_SIZE)
+            add_formatted_text_to_paragraph(para, block['content'], BODY_FONT, BODY_SIZE,
+                                            bold_ranges=block.get('bold_ranges'))
         
         elif block['type'] == 'bullet_list':
             # Add bullet list items with consistent formatting
@@ -571,30 +654,9 @@ def build_section_blocks(sections_dict: Dict[str, Any], assessment_sections: Dic
     """
     blocks = []
     
-    section_order = {
-        "executive_summary": "Executive Summary",
-        "company_snapshot": "Company Snapshot",
-        "people": "Team & Leadership",
-        "market_opportunity": "Market Opportunity", 
-        "competitive_landscape": "Competitive Landscape",
-        "product": "Product & Technology",
-        "financial": "Financial Analysis",
-        "traction_validation": "Traction & Validation",
-        "deal_considerations": "Deal Considerations"
-    }
-    
-    assessment_mapping = {
-        "assessment_people": "Team & Leadership",
-        "assessment_market_opportunity": "Market Opportunity", 
-        "assessment_product": "Product & Technology",
-        "assessment_financials": "Financial Health",
-        "assessment_traction_validation": "Traction & Validation",
-        "assessment_deal_considerations": "Deal Structure"
-    }
-    
     # Add Executive Summary first
-    if "executive_summary" in sections_dict:
-        section = sections_dict["executive_summary"]
+    section = sections_dict.get("executive_summary")
+    if section is not None:
         content = section.content if hasattr(section, 'content') else section
         blocks.append({
             'type': 'section_heading',
@@ -612,42 +674,43 @@ def build_section_blocks(sections_dict: Dict[str, Any], assessment_sections: Dic
         })
         
         # Format each assessment as readable text with category, rating, and full justification
-        for section_key, section_title in assessment_mapping.items():
-            if section_key in assessment_sections:
-                section = assessment_sections[section_key]
-                content = section.content if hasattr(section, 'content') else section
-                
-                # Extract rating and full content
-                rating, cleaned_content = extract_rating_from_content(content)
-                
-                # Format as: "Category: Rating\nFull justification text"
-                assessment_text = f"{section_title}"
-                if rating:
-                    assessment_text += f": {rating}"
-                assessment_text += "\n"
-                if cleaned_content:
-                    assessment_text += cleaned_content
-                
-                # Category and rating as bold header (10pt)
-                header_text = section_title
-                if rating:
-                    header_text += f": {rating}"
-                blocks.append({
-                    'type': 'bold_header',
-                    'content': header_text
-                })
-                
-                # Justification as paragraph
-                if cleaned_content:
-                    formatted_blocks = format_section_content(cleaned_content, section_key)
-                    blocks.extend(formatted_blocks)
+        for section_key, section_title in _ASSESSMENT_MAPPING:
+            section = assessment_sections.get(section_key)
+            if section is None:
+                continue
+            content = section.content if hasattr(section, 'content') else section
+            
+            # Extract rating and full content
+            rating, cleaned_content = extract_rating_from_content(content)
+            
+            # Format as: "Category: Rating\nFull justification text"
+            assessment_text = f"{section_title}"
+            if rating:
+                assessment_text += f": {rating}"
+            assessment_text += "\n"
+            if cleaned_content:
+                assessment_text += cleaned_content
+            
+            # Category and rating as bold header (10pt)
+            header_text = section_title
+            if rating:
+                header_text += f": {rating}"
+            blocks.append({
+                'type': 'bold_header',
+                'content': header_text
+            })
+            
+            # Justification as paragraph
+            if cleaned_content:
+                formatted_blocks = format_section_content(cleaned_content, section_key)
+                blocks.extend(formatted_blocks)
         
         blocks.append({'type': 'paragraph', 'content': ''})  # Spacing
     
     # Add main sections in order
-    for section_key, section_title in section_order.items():
-        if section_key in sections_dict and section_key != "executive_summary":
-            section = sections_dict[section_key]
+    for section_key, section_title in _SECTION_ORDER:
+        section = sections_dict.get(section_key)
+        if section is not None and section_key != "executive_summary":
             content = section.content if hasattr(section, 'content') else section
             
             blocks.append({
@@ -661,17 +724,24 @@ def build_section_blocks(sections_dict: Dict[str, Any], assessment_sections: Dic
     
     return blocks
 
+def _collect_sources(sections) -> List[str]:
+    """Return the unique, non-empty data sources across sections, sorted alphabetically"""
+    return sorted({
+        source
+        for section in sections
+        if isinstance(getattr(section, 'data_sources', None), list)
+        for source in section.data_sources
+        if source
+    })
+
 def add_sources_section(doc: Document, sections: List):
     """Add a sources/references section at the end of the document"""
+    _load_docx()
     
-    # Collect all unique sources from all sections
-    all_sources = set()
+    # Collect all unique sources from all sections, sorted alphabetically
+    sorted_sources = _collect_sources(sections)
     
-    for section in sections:
-        if section.data_sources and isinstance(section.data_sources, list):
-            all_sources.update(section.data_sources)
-    
-    if not all_sources:
+    if not sorted_sources:
         return
     
     # Add page break before sources
@@ -684,10 +754,7 @@ def add_sources_section(doc: Document, sections: List):
     # Add description
     desc = doc.add_paragraph()
     desc.add_run("The following sources were used in the preparation of this investment memo:").italic = True
-    desc.paragraph_format.space_after = Pt(12)
-    
-    # Sort sources alphabetically and add them
-    sorted_sources = sorted(list(all_sources))
+    desc.paragraph_format.space_after = _PT_12
     
     for i, source in enumerate(sorted_sources, 1):
         source_para = doc.add_paragraph(style='List Number')
@@ -696,13 +763,77 @@ def add_sources_section(doc: Document, sections: List):
         # Format the source text
         for run in source_para.runs:
             run.font.name = 'Bangla Sangam MN'
-            run.font.size = Pt(10)
+            run.font.size = _PT_10
         
-        source_para.paragraph_format.space_after = Pt(6)
-        source_para.paragraph_format.left_indent = Inches(0.25)
+        source_para.paragraph_format.space_after = _PT_6
+        source_para.paragraph_format.left_indent = _IN_025
 
 # Update the generate_word_document function to call this
 
+def _fetch_memo_with_sections(db: Session, memo_request_id: int,
+                              status: Optional[str] = "completed") -> Tuple[Optional[MemoRequest], List[MemoSection]]:
+    """
+    Load a memo request and its sections (optionally filtered by status) in a
+    single round trip, with sections ordered by creation time.
+    Returns (None, []) if the memo request does not exist.
+    """
+    join_condition = MemoSection.memo_request_id == MemoRequest.id
+    if status is not None:
+        join_condition = and_(join_condition, MemoSection.status == status)
+    
+    rows = (
+        db.query(MemoRequest, MemoSection)
+        .outerjoin(MemoSection, join_condition)
+        .filter(MemoRequest.id == memo_request_id)
+        .order_by(MemoSection.created_at)
+        .all()
+    )
+    
+    if not rows:
+        return None, []
+    return rows[0][0], [section for _, section in rows if section is not None]
+
+@lru_cache(maxsize=None)
+def _ensure_output_dir(path: str) -> str:
+    """Create an output directory once per process and return it"""
+    os.makedirs(path, exist_ok=True)
+    return path
+
+def _save_document(doc: Document, file_path: str) -> int:
+    """Serialize the document in memory, write it next to file_path and atomically
+    move it into place. Returns the number of bytes written."""
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    tmp_path = f"{file_path}.tmp"
+    try:
+        # file.write loops until the whole buffer is on disk (os.write may write less)
+        with open(tmp_path, 'wb') as f:
+            f.write(buffer.getbuffer())
+        os.replace(tmp_path, file_path)
+    except Exception:
+        # Don't leave a partial <file>.tmp behind
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+    return buffer.tell()
+
+@lru_cache(maxsize=None)
+def _styled_template_bytes(create_styles) -> bytes:
+    """Build an empty document with the given styles applied once and keep its serialized bytes"""
+    _load_docx()
+    doc = Document()
+    create_styles(doc)
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    return buffer.getvalue()
+
+def _new_styled_document(create_styles) -> Document:
+    """Open a fresh document from the cached, pre-styled template"""
+    template = _styled_template_bytes(create_styles)
+    return Document(io.BytesIO(template))
+
 def generate_google_doc(user, db: Session, sections_dict: Dict[str, Any], company_name: str) -> str:
     """
     Generate a Google Doc from memo sections and save it to Investments folder.
@@ -721,61 +852,50 @@ def generate_google_doc(user, db: Session, sections_dict: Dict[str, Any], compan
     )
     
     try:
-        print(f"Starting Google Doc generation for {company_name}")
+        logger.info("Starting Google Doc generation for %s", company_name)
         
-        # Separate assessment sections from main sections
-        assessment_sections = {k: v for k, v in sections_dict.items() if k.startswith('assessment_')}
-        main_sections_dict = {k: v for k, v in sections_dict.items() if not k.startswith('assessment_')}
+        # Separate assessment sections from main sections in a single pass
+        assessment_sections = {}
+        main_sections_dict = {}
+        for k, v in sections_dict.items():
+            if k.startswith('assessment_'):
+                assessment_sections[k] = v
+            else:
+                main_sections_dict[k] = v
         
         # Build blocks from sections
         blocks = build_section_blocks(main_sections_dict, assessment_sections)
         
         # Add sources section at the end
-        all_sources = set()
-        for section in sections_dict.values():
-            if hasattr(section, 'data_sources') and section.data_sources:
-                if isinstance(section.data_sources, list):
-                    all_sources.update(section.data_sources)
+        all_sources = _collect_sources(sections_dict.values())
         
         if all_sources:
             blocks.append({
                 'type': 'heading',
                 'content': 'Sources'
             })
-            for source in sorted(all_sources):
+            for source in all_sources:
                 blocks.append({
                     'type': 'paragraph',
                     'content': source
                 })
         
         # Create document title with date in DD/MM/YY format
-        generation_date = datetime.now().strftime("%d/%m/%y")
+        now = datetime.now()
+        generation_date = now.strftime("%d/%m/%y")
         
         # Add title and subtitle blocks at the beginning
         header_blocks = [
-            {
-                'type': 'title',
-                'content': f"{company_name} - {generation_date}"
-            },
-            {
-                'type': 'subtitle',
-                'content': 'Series A Memo'
-            },
-            {
-                'type': 'subtitle',
-                'content': 'Deal Team: [To Be Determined]'  # Placeholder for now
-            },
-            {
-                'type': 'paragraph',
-                'content': ''  # Spacing
-            }
+            {**block, 'content': block['content'].format(company=company_name, date=generation_date)}
+            if '{' in block['content'] else dict(block)
+            for block in _GOOGLE_DOC_HEADER_TEMPLATE
         ]
         
         # Prepend header blocks to content blocks
         blocks = header_blocks + blocks
         
         # Create document title for file name: IC Memo_[company name] DD_MM_YYYY
-        generation_date_for_filename = datetime.now().strftime("%d_%m_%Y")
+        generation_date_for_filename = now.strftime("%d_%m_%Y")
         doc_title = f"IC Memo_{company_name} {generation_date_for_filename}"
         
         # Create Google Doc (no folder, will be in user's Drive root)
@@ -787,189 +907,145 @@ def generate_google_doc(user, db: Session, sections_dict: Dict[str, Any], compan
             parent_folder_id=None
         )
         
-        print(f"✅ Google Doc created: {doc_url}")
+        logger.info("✅ Google Doc created: %s", doc_url)
         return doc_url
         
     except ValueError as e:
         if "No Google tokens found" in str(e):
             error_msg = "Google Drive connection required. Please connect your Google account via OAuth to generate documents."
-            print(f"❌ Error generating Google Doc: {error_msg}")
+            logger.error("❌ Error generating Google Doc: %s", error_msg)
             raise ValueError(error_msg)
         else:
-            print(f"❌ Error generating Google Doc: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("❌ Error generating Google Doc: %s", e)
             raise
     except Exception as e:
-        print(f"❌ Error generating Google Doc: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("❌ Error generating Google Doc: %s", e)
         raise
 
 def generate_word_document(db: Session, memo_request_id: int) -> Optional[str]:
     """Generate a formatted Word document from memo sections with sources"""
     
     try:
-        print(f"Starting document generation for memo {memo_request_id}")
+        logger.info("Starting document generation for memo %s", memo_request_id)
         
         # Check if python-docx is available
         try:
-            from docx import Document
-            from docx.shared import Pt, Inches, RGBColor
-            from docx.enum.text import WD_ALIGN_PARAGRAPH
-            from docx.oxml import OxmlElement
-            from docx.oxml.ns import qn
-            print("✅ python-docx is available")
+            _load_docx()
+            logger.debug("✅ python-docx is available")
         except ImportError as e:
-            print(f"❌ python-docx import error: {str(e)}")
+            logger.error("❌ python-docx import error: %s", e)
             return None
         
         # Get memo request
-        memo_request = db.query(MemoRequest).filter(
-            MemoRequest.id == memo_request_id
-        ).first()
+        memo_request, sections = _fetch_memo_with_sections(db, memo_request_id)
         
         if not memo_request:
-            print(f"❌ Memo request {memo_request_id} not found")
+            logger.warning("❌ Memo request %s not found", memo_request_id)
             return None
         
-        print(f"✅ Found memo request for {memo_request.company_name}")
+        logger.debug("✅ Found memo request for %s", memo_request.company_name)
         
-        # Get all completed sections
-        sections = db.query(MemoSection).filter(
-            MemoSection.memo_request_id == memo_request_id,
-            MemoSection.status == "completed"
-        ).order_by(MemoSection.created_at).all()
-        
-        print(f"Found {len(sections)} completed sections")
+        logger.debug("Found %d completed sections", len(sections))
         
         if not sections:
-            print("❌ No completed sections found for this memo")
+            logger.warning("❌ No completed sections found for this memo")
             return None
         
-        for section in sections:
-            print(f"  - {section.section_name}: {len(section.content) if section.content else 0} chars")
+        if logger.isEnabledFor(logging.DEBUG):
+            for section in sections:
+                logger.debug("  - %s: %d chars", section.section_name, len(section.content or ""))
         
         # Create document
-        print("Creating Word document...")
-        doc = Document()
-        create_memo_styles(doc)
+        logger.debug("Creating Word document...")
+        doc = _new_styled_document(create_memo_styles)
         
         # Add document title and company info
         title_para = doc.add_paragraph("INVESTMENT COMMITTEE MEMO", style='Memo Title')
         company_para = doc.add_paragraph(memo_request.company_name, style='Company Name')
         
         # Add generation info
-        generation_date = datetime.now().strftime("%B %d, %Y")
+        now = datetime.now()
+        generation_date = now.strftime("%B %d, %Y")
         info_para = doc.add_paragraph(f"Generated: {generation_date}")
         info_para.alignment = WD_ALIGN_PARAGRAPH.CENTER
         for run in info_para.runs:
             run.font.name = 'Bangla Sangam MN'
-            run.font.size = Pt(10)
+            run.font.size = _PT_10
             run.font.color.rgb = RGBColor(127, 140, 141)
         
         doc.add_paragraph()  # Spacing
         
-        print("✅ Added title and header")
+        logger.debug("✅ Added title and header")
         
         # Add header and footer
         add_header_footer(doc, memo_request.company_name, generation_date)
         
-        # Create sections lookup
-        sections_dict = {section.section_name: section for section in sections}
-        
-        # Separate assessment sections from main sections
-        assessment_sections = {k: v for k, v in sections_dict.items() if k.startswith('assessment_')}
-        main_sections_dict = {k: v for k, v in sections_dict.items() if not k.startswith('assessment_')}
+        # Create sections lookups, separating assessment sections from main sections
+        assessment_sections = {}
+        main_sections_dict = {}
+        for section in sections:
+            bucket = assessment_sections if section.section_name.startswith('assessment_') else main_sections_dict
+            bucket[section.section_name] = section
         
-        print(f"Main sections: {list(main_sections_dict.keys())}")
-        print(f"Assessment sections: {list(assessment_sections.keys())}")
+        logger.debug("Main sections: %s", list(main_sections_dict))
+        logger.debug("Assessment sections: %s", list(assessment_sections))
         
         # Add Executive Summary first
-        if "executive_summary" in main_sections_dict:
-            print("Adding executive summary...")
-            add_section_to_document(doc, "executive_summary", main_sections_dict["executive_summary"].content, 
-                                  {"executive_summary": "Executive Summary"})
+        executive_summary = main_sections_dict.get("executive_summary")
+        if executive_summary is not None:
+            logger.debug("Adding executive summary...")
+            add_section_to_document(doc, "executive_summary", executive_summary.content, "Executive Summary")
             doc.add_paragraph()  # Spacing
         
         # Add Assessment Summary Table
         if assessment_sections:
-            print("Adding assessment table...")
+            logger.debug("Adding assessment table...")
             create_assessment_table(doc, assessment_sections)
             doc.add_page_break()
         
-        # Main section order (excluding executive summary since we added it first)
-        main_section_order = {
-            "company_snapshot": "Company Snapshot",
-            "people": "Team & Leadership",
-            "market_opportunity": "Market Opportunity", 
-            "competitive_landscape": "Competitive Landscape",
-            "product": "Product & Technology",
-            "financial": "Financial Analysis",
-            "traction_validation": "Traction & Validation",
-            "deal_considerations": "Deal Considerations"
-        }
-        
         # Add main sections in proper order with enhanced formatting
-        for section_key, section_title in main_section_order.items():
-            if section_key in main_sections_dict:
-                print(f"Adding section with formatting: {section_title}")
-                add_section_to_document(doc, section_key, main_sections_dict[section_key].content, 
-                                      {section_key: section_title})
-                doc.add_paragraph()  # Spacing between sections
+        # (excluding executive summary since we added it first)
+        for section_key, section_title in _SECTION_ORDER[1:]:
+            section = main_sections_dict.get(section_key)
+            if section is None:
+                continue
+            logger.debug("Adding section with formatting: %s", section_title)
+            add_section_to_document(doc, section_key, section.content, section_title)
+            doc.add_paragraph()  # Spacing between sections
         
         # ADD SOURCES SECTION HERE
-        print("Adding sources section...")
+        logger.debug("Adding sources section...")
         add_sources_section(doc, sections)
         
         # Ensure documents directory exists
-        docs_dir = os.path.join(os.path.dirname(__file__), '..', '..', 'generated_docs')
-        print(f"Documents directory: {docs_dir}")
-        
-        os.makedirs(docs_dir, exist_ok=True)
-        print("✅ Documents directory created/verified")
+        docs_dir = _ensure_output_dir(_DOCS_DIR)
+        logger.debug("Documents directory: %s", docs_dir)
         
         # Generate filename with timestamp
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        safe_company_name = memo_request.company_name.replace(' ', '_').replace('/', '_')
+        timestamp = now.strftime("%Y%m%d_%H%M%S")
+        safe_company_name = memo_request.company_name.translate(_FILENAME_SAFE)
         filename = f"IC_Memo_{safe_company_name}_{timestamp}.docx"
         file_path = os.path.join(docs_dir, filename)
         
-        print(f"Saving document to: {file_path}")
+        logger.debug("Saving document to: %s", file_path)
         
         # Save the document
-        doc.save(file_path)
-        print("✅ Word document saved successfully with enhanced formatting")
-        
-        # Verify file exists
-        if os.path.exists(file_path):
-            file_size = os.path.getsize(file_path)
-            print(f"✅ Document file exists, size: {file_size} bytes")
-            return file_path
-        else:
-            print("❌ Document file was not created")
-            return None
+        file_size = _save_document(doc, file_path)
+        logger.info("✅ Word document saved successfully with enhanced formatting, size: %d bytes", file_size)
+        return file_path
         
     except Exception as e:
-        print(f"❌ Error generating Word document: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("❌ Error generating Word document: %s", e)
         return None
 
 def get_document_summary(db: Session, memo_request_id: int) -> Dict[str, Any]:
     """Get a summary of document generation status"""
     
-    memo_request = db.query(MemoRequest).filter(
-        MemoRequest.id == memo_request_id
-    ).first()
+    memo_request, sections = _fetch_memo_with_sections(db, memo_request_id, status=None)
     
     if not memo_request:
         return {"error": "Memo request not found"}
     
-    sections = db.query(MemoSection).filter(
-        MemoSection.memo_request_id == memo_request_id
-    ).all()
-    
     completed_sections = [s for s in sections if s.status == "completed"]
     failed_sections = [s for s in sections if s.status == "failed"]
     
@@ -998,43 +1074,46 @@ def get_document_summary(db: Session, memo_request_id: int) -> Dict[str, Any]:
 # --------------------------------------------------------------------------
 def create_short_memo_styles(doc: Document):
     """Create consistent styles for the short memo document"""
+    _load_docx()
     styles = doc.styles
     FONT = "Bangla Sangam MN"
 
-    def ensure_style(name, style_type, config_fn):
-        if name not in [s.name for s in styles]:
-            style = styles.add_style(name, style_type)
-            config_fn(style)
-
-    ensure_style("Short Title", WD_STYLE_TYPE.PARAGRAPH, lambda s: (
-        setattr(s.font, "name", FONT),
-        setattr(s.font, "size", Pt(14)),
-        setattr(s.font, "bold", True),
-        setattr(s.paragraph_format, "alignment", WD_ALIGN_PARAGRAPH.CENTER),
-        setattr(s.paragraph_format, "space_after", Pt(12))
-    ))
-
-    ensure_style("Short Subtitle", WD_STYLE_TYPE.PARAGRAPH, lambda s: (
-        setattr(s.font, "name", FONT),
-        setattr(s.font, "size", Pt(12)),
-        setattr(s.font, "bold", True),
-        setattr(s.paragraph_format, "alignment", WD_ALIGN_PARAGRAPH.CENTER),
-        setattr(s.paragraph_format, "space_after", Pt(10))
-    ))
-
-    ensure_style("Short Body", WD_STYLE_TYPE.PARAGRAPH, lambda s: (
-        setattr(s.font, "name", FONT),
-        setattr(s.font, "size", Pt(10)),
-        setattr(s.paragraph_format, "space_after", Pt(6)),
-        setattr(s.paragraph_format, "line_spacing", 1.2)
-    ))
-
-    ensure_style("List Bullet", WD_STYLE_TYPE.PARAGRAPH, lambda s: (
-        setattr(s.font, "name", FONT),
-        setattr(s.font, "size", Pt(10)),
-        setattr(s.paragraph_format, "left_indent", Inches(0.25)),
-        setattr(s.paragraph_format, "space_after", Pt(4))
-    ))
+    # Collect existing style names once instead of rescanning per check
+    existing = {s.name for s in styles}
+
+    if "Short Title" not in existing:
+        style = styles.add_style("Short Title", WD_STYLE_TYPE.PARAGRAPH)
+        font = style.font
+        font.name = FONT
+        font.size = _PT_14
+        font.bold = True
+        style.paragraph_format.alignment = WD_ALIGN_PARAGRAPH.CENTER
+        style.paragraph_format.space_after = _PT_12
+
+    if "Short Subtitle" not in existing:
+        style = styles.add_style("Short Subtitle", WD_STYLE_TYPE.PARAGRAPH)
+        font = style.font
+        font.name = FONT
+        font.size = _PT_12
+        font.bold = True
+        style.paragraph_format.alignment = WD_ALIGN_PARAGRAPH.CENTER
+        style.paragraph_format.space_after = _PT_10
+
+    if "Short Body" not in existing:
+        style = styles.add_style("Short Body", WD_STYLE_TYPE.PARAGRAPH)
+        font = style.font
+        font.name = FONT
+        font.size = _PT_10
+        style.paragraph_format.space_after = _PT_6
+        style.paragraph_format.line_spacing = 1.2
+
+    if "List Bullet" not in existing:
+        style = styles.add_style("List Bullet", WD_STYLE_TYPE.PARAGRAPH)
+        font = style.font
+        font.name = FONT
+        font.size = _PT_10
+        style.paragraph_format.left_indent = _IN_025
+        style.paragraph_format.space_after = _PT_4
 
 
 # --------------------------------------------------------------------------
@@ -1042,6 +1121,7 @@ def create_short_memo_styles(doc: Document):
 # --------------------------------------------------------------------------
 def add_short_memo_header(doc: Document, company_name: str, series_text: str):
     """Add the company name and memo subtitle at the top"""
+    _load_docx()
     doc.add_paragraph(company_name, style="Short Title")
 
     subtitle_para = doc.add_paragraph(f"Initial {series_text} IC Memo", style="Short Subtitle")
@@ -1063,6 +1143,7 @@ def add_short_memo_header(doc: Document, company_name: str, series_text: str):
 # --------------------------------------------------------------------------
 def add_short_problem_solution_table(doc: Document, problem_text: str, solution_text: str):
     """Add a formatted 2x2 Problem/Solution table"""
+    _load_docx()
     FONT = "Bangla Sangam MN"
 
     table = doc.add_table(rows=2, cols=2)
@@ -1070,26 +1151,16 @@ def add_short_problem_solution_table(doc: Document, problem_text: str, solution_
     table.autofit = False
     table.alignment = WD_TABLE_ALIGNMENT.LEFT
     
-    # Set column widths more explicitly
-    table.columns[0].width = Inches(1.0)  # Header column
-    table.columns[1].width = Inches(5.0)  # Content column
-    
     # Ensure table width is set to match column widths
     table.width = Inches(6.0)  # Total width = 1.0 + 5.0
     
-    # Force column widths using XML properties
-    for i, col in enumerate(table.columns):
-        col_width = Inches(1.0) if i == 0 else Inches(5.0)
+    # Header column / content column. Word only honours the width when it is on
+    # every cell as well as the grid column, so set both once per column. The
+    # cell setter updates the existing w:tcW in place instead of appending another.
+    for col, col_width in zip(table.columns, (Inches(1.0), Inches(5.0))):
         col.width = col_width
-        
-        # Set column width in XML
-        for cell in [row.cells[i] for row in table.rows]:
-            tc = cell._tc
-            tcPr = tc.get_or_add_tcPr()
-            tcW = OxmlElement('w:tcW')
-            tcW.set(qn('w:w'), str(int(col_width.inches * 1440)))  # Convert to twentieths of a point
-            tcW.set(qn('w:type'), 'dxa')
-            tcPr.append(tcW)
+        for cell in col.cells:
+            cell.width = col_width
 
     headers = ["Problem:", "Solution:"]
     values = [problem_text or "Problem not provided", solution_text or "Solution not provided"]
@@ -1100,21 +1171,18 @@ def add_short_problem_solution_table(doc: Document, problem_text: str, solution_
         header_cell.text = headers[i]
 
         # Apply shading (light green)
-        tc_pr = header_cell._tc.get_or_add_tcPr()
-        shd = OxmlElement("w:shd")
-        shd.set(qn("w:fill"), "a6ddce")
-        tc_pr.append(shd)
+        header_cell._tc.get_or_add_tcPr().append(_build_shd("a6ddce"))
 
         for run in header_cell.paragraphs[0].runs:
             run.font.name = FONT
-            run.font.size = Pt(11)
+            run.font.size = _PT_11
             run.font.bold = True
 
         # Value cell
         value_cell = table.rows[i].cells[1]
         para = value_cell.paragraphs[0]
         add_formatted_text_to_paragraph(para, values[i], FONT, 10)
-        para.paragraph_format.space_after = Pt(4)
+        para.paragraph_format.space_after = _PT_4
 
     doc.add_paragraph()  # spacing below table
 
@@ -1124,30 +1192,16 @@ def add_short_problem_solution_table(doc: Document, problem_text: str, solution_
 # --------------------------------------------------------------------------
 def clean_markdown_formatting_short(content: str) -> str:
     """Simplified markdown cleaner for short memo sections"""
-    content = re.sub(r"#+\s*", "", content)  # remove headers
-    content = re.sub(r"\*\*([^*]+)\*\*", r"\1", content)  # remove bold markers
-    content = re.sub(r"\s+", " ", content)
+    content = _HASH_RUN.sub("", content)  # remove headers
+    content = _BOLD_RE.sub(r"\1", content)  # remove bold markers
+    content = _WS_RUN.sub(" ", content)
     return content.strip()
 
 
 def format_short_section_content(content: str) -> List[str]:
     """Break section content into bullet-style or paragraph chunks (for short memos)"""
     content = clean_markdown_formatting_short(content)
-    lines = [l.strip() for l in content.split("\n") if l.strip()]
-    return lines
-
-
-def add_formatted_text_to_paragraph(paragraph, text: str, font_name: str, font_size: int):
-    """Add text to a paragraph with inline bold parsing"""
-    parts = re.split(r"\*\*([^*]+)\*\*", text)
-    for i, part in enumerate(parts):
-        if not part:
-            continue
-        run = paragraph.add_run(part)
-        run.font.name = font_name
-        run.font.size = Pt(font_size)
-        if i % 2 == 1:
-            run.bold = True
+    return [line.strip() for line in _NONBLANK_LINE.findall(content)]
 
 
 # --------------------------------------------------------------------------
@@ -1155,6 +1209,7 @@ def add_formatted_text_to_paragraph(paragraph, text: str, font_name: str, font_s
 # --------------------------------------------------------------------------
 def add_short_section(doc: Document, section: MemoSection):
     """Add section content (without title) as bullet points or short paragraphs"""
+    _load_docx()
     if not section or not section.content:
         return
 
@@ -1167,7 +1222,7 @@ def add_short_section(doc: Document, section: MemoSection):
             add_formatted_text_to_paragraph(para, f"• {text}", "Bangla Sangam MN", 10)
         else:
             para = doc.add_paragraph(line.strip(), style="Short Body")
-            para.paragraph_format.space_after = Pt(6)
+            para.paragraph_format.space_after = _PT_6
     doc.add_paragraph()  # spacing after each section
 
 
@@ -1176,20 +1231,16 @@ def add_short_section(doc: Document, section: MemoSection):
 # --------------------------------------------------------------------------
 def add_short_sources(doc: Document, sections: List[MemoSection]):
     """Add a list of unique sources at the end of the short memo"""
-    all_sources = set()
-    for section in sections:
-        if section.data_sources:
-            all_sources.update(section.data_sources)
-
-    if not all_sources:
+    _load_docx()
+    sorted_sources = _collect_sources(sections)
+    if not sorted_sources:
         return
 
     doc.add_paragraph("Sources", style="Short Subtitle")
-    sorted_sources = sorted(list(all_sources))
     for idx, src in enumerate(sorted_sources, 1):
         para = doc.add_paragraph(f"[{idx}] {src}", style="Short Body")
-        para.paragraph_format.left_indent = Inches(0.25)
-        para.paragraph_format.space_after = Pt(4)
+        para.paragraph_format.left_indent = _IN_025
+        para.paragraph_format.space_after = _PT_4
 
 
 # --------------------------------------------------------------------------
@@ -1198,27 +1249,22 @@ def add_short_sources(doc: Document, sections: List[MemoSection]):
 def generate_short_word_document(db: Session, memo_request_id: int) -> Optional[str]:
     """Generate a formatted short memo Word document"""
     try:
-        print(f"Starting short memo generation for ID {memo_request_id}")
+        _load_docx()
+        logger.info("Starting short memo generation for ID %s", memo_request_id)
 
-        memo_request = db.query(MemoRequest).filter(MemoRequest.id == memo_request_id).first()
+        memo_request, sections = _fetch_memo_with_sections(db, memo_request_id)
         if not memo_request:
-            print("❌ Memo request not found")
+            logger.warning("❌ Memo request not found")
             return None
 
-        sections = (
-            db.query(MemoSection)
-            .filter(MemoSection.memo_request_id == memo_request_id, MemoSection.status == "completed")
-            .all()
-        )
         if not sections:
-            print("❌ No completed sections found")
+            logger.warning("❌ No completed sections found")
             return None
 
         sections_dict = {s.section_name: s for s in sections}
 
         # Create document
-        doc = Document()
-        create_short_memo_styles(doc)
+        doc = _new_styled_document(create_short_memo_styles)
 
         # Header
         add_short_memo_header(doc, memo_request.company_name, "[X]")
@@ -1233,8 +1279,9 @@ def generate_short_word_document(db: Session, memo_request_id: int) -> Optional[
         )
 
         # Company Brief
-        if "company_brief" in sections_dict:
-            add_short_section(doc, sections_dict["company_brief"])
+        company_brief = sections_dict.get("company_brief")
+        if company_brief:
+            add_short_section(doc, company_brief)
 
         # Bullet Point Sections
         ordered_sections = [
@@ -1254,16 +1301,25 @@ def generate_short_word_document(db: Session, memo_request_id: int) -> Optional[
         add_short_sources(doc, sections)
 
         # Save document
-        output_dir = os.path.join(os.path.dirname(__file__), "..", "..", "generated_documents")
-        os.makedirs(output_dir, exist_ok=True)
-        filename = f"short_memo_{memo_request_id}_{memo_request.company_name.replace(' ', '_')}.docx"
+        output_dir = _ensure_output_dir(_SHORT_DOCS_DIR)
+        filename = f"short_memo_{memo_request_id}_{memo_request.company_name.translate(_FILENAME_SAFE)}.docx"
         file_path = os.path.join(output_dir, filename)
-        doc.save(file_path)
-        print(f"✅ Short memo saved: {file_path}")
+        _save_document(doc, file_path)
+        logger.info("✅ Short memo saved: %s", file_path)
         return file_path
 
     except Exception as e:
-        print(f"❌ Error generating short memo: {e}")
-        import traceback
-        traceback.print_exc()
-        return None
\ No newline at end of file
+        logger.exception("❌ Error generating short memo: %s", e)
+        return None
+
+
+# --------------------------------------------------------------------------
+# Async entry point
+# --------------------------------------------------------------------------
+# Google Doc builds mix blocking DB reads, block building and blocking Google
+# API calls. This wrapper runs them on a worker thread so the async routes do not
+# stall the event loop and several memos can be generated concurrently.
+
+async def generate_google_doc_async(user, db: Session, sections_dict: Dict[str, Any], company_name: str) -> str:
+    """Async wrapper around generate_google_doc"""
+    return await asyncio.to_thread(generate_google_doc, user, db, sections_dict, company_name)
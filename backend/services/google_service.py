@@ -1,25 +1,35 @@
+from __future__ import annotations
+
 import os
 import json
-from datetime import datetime, timezone
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import wraps
+from datetime import datetime, timezone, timedelta
+from functools import lru_cache
 from typing import Optional, List, Dict, Any
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
-from google.oauth2.credentials import Credentials
-from google.auth.transport.requests import Request
-from googleapiclient.discovery import build
 from backend.db.models import GoogleToken, User
 
-# Secret Manager import (optional)
-try:
-    from google.cloud import secretmanager
-    HAS_SECRET_MANAGER = True
-except ImportError:
-    HAS_SECRET_MANAGER = False
+logger = logging.getLogger(__name__)
+
+# The Google client libraries (and Secret Manager's gRPC stack) are slow to import,
+# so they are loaded on first use by _load_google() rather than at worker boot.
+Credentials = Request = build = secretmanager = None
+HAS_SECRET_MANAGER = False
 
 # Config
 GOOGLE_CLIENT_ID = os.getenv("GOOGLE_CLIENT_ID")
 GOOGLE_CLIENT_SECRET = os.getenv("GOOGLE_CLIENT_SECRET")
 GOOGLE_CLOUD_PROJECT = os.getenv("GOOGLE_CLOUD_PROJECT", "icmemogenerator-475014")
 DRIVE_TOKEN_SECRET_NAME = os.getenv("DRIVE_TOKEN_SECRET_NAME", "google-drive-oauth-tokens")
+# Set USE_SECRET_MANAGER=0 (e.g. local dev) to go straight to the user's stored tokens
+USE_SECRET_MANAGER = os.getenv("USE_SECRET_MANAGER", "1") == "1"
+# Retries for transient Google API failures (429/5xx, connection errors); the client
+# library backs off exponentially with jitter between attempts
+GOOGLE_API_RETRIES = int(os.getenv("GOOGLE_API_RETRIES", "3"))
 SCOPES = [
     "https://www.googleapis.com/auth/drive.readonly",
     "https://www.googleapis.com/auth/drive.file",
@@ -27,37 +37,119 @@ SCOPES = [
     "https://www.googleapis.com/auth/documents"
 ]
 
+# Google Doc text style per block type, built once and shared by every updateTextStyle request
+_HEADING_STYLE = {"fontSize": {"magnitude": 12, "unit": "PT"}, "bold": True}
+_BOLD_BODY_STYLE = {"fontSize": {"magnitude": 10, "unit": "PT"}, "bold": True}
+_BODY_STYLE = {"fontSize": {"magnitude": 10, "unit": "PT"}, "bold": False}
+_BLOCK_STYLES = {
+    'title': _HEADING_STYLE,
+    'section_heading': _HEADING_STYLE,
+    'subtitle': _BODY_STYLE,
+    'subsection_header': _BOLD_BODY_STYLE,
+    'bold_header': _BOLD_BODY_STYLE,
+    'paragraph': _BODY_STYLE,
+    'bullet': _BODY_STYLE,
+}
+_BLOCK_FIELDS = "fontSize,bold"
+_INLINE_BOLD_STYLE = {"bold": True}
+
+# Per-user credentials cache (user_id -> Credentials), reused until close to expiry
+_CREDS_CACHE: Dict[int, Credentials] = {}
+_CREDS_CACHE_LOCK = threading.Lock()
+_CREDS_MIN_TTL = timedelta(seconds=60)
+
+# Secret Manager credentials are shared by all users, so they are cached once for the process
+_SECRET_MANAGER_CLIENT = None
+_SECRET_CREDS: Optional[Credentials] = None
+_SECRET_CREDS_LOCK = threading.Lock()
+
+# Shared drive and folder IDs never change for the lifetime of the process, so
+# successful lookups are remembered (drive name -> ID, (folder, drive, parent) -> ID)
+_DRIVE_ID_CACHE: Dict[str, str] = {}
+_FOLDER_ID_CACHE: Dict[tuple, str] = {}
+
+# Worker threads for independent Google API calls made within a single request
+_API_POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix="google-api")
+
+# Built API clients are cached per thread: they wrap an httplib2.Http, which is not thread-safe
+_service_local = threading.local()
+
+@lru_cache(maxsize=None)
+def _load_google():
+    """Import the Google client libraries on first use"""
+    global Credentials, Request, build, secretmanager, HAS_SECRET_MANAGER
+
+    from google.oauth2.credentials import Credentials
+    from google.auth.transport.requests import Request
+    from googleapiclient.discovery import build
+
+    # Secret Manager import (optional)
+    try:
+        from google.cloud import secretmanager
+        HAS_SECRET_MANAGER = True
+    except ImportError:
+        HAS_SECRET_MANAGER = False
+
+def _creds_still_valid(creds: Credentials) -> bool:
+    """True if creds are valid and not within _CREDS_MIN_TTL of expiring."""
+    if not creds.valid:
+        return False
+    if creds.expiry is None:
+        return True
+    # google-auth stores expiry as a naive UTC datetime
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    return creds.expiry - now > _CREDS_MIN_TTL
+
+def _get_secret_manager_client():
+    """Return the process-wide Secret Manager client, creating it (and its gRPC channel) once."""
+    global _SECRET_MANAGER_CLIENT
+    if _SECRET_MANAGER_CLIENT is None:
+        _SECRET_MANAGER_CLIENT = secretmanager.SecretManagerServiceClient()
+    return _SECRET_MANAGER_CLIENT
+
 def _get_creds_from_secret_manager() -> Optional[Credentials]:
     """
     Get Google Drive credentials from Google Cloud Secret Manager.
+    The parsed credentials are cached and reused until they are close to expiry.
     Returns None if Secret Manager is not available or tokens not found.
     Raises ValueError with detailed error message if Secret Manager access fails.
     """
+    global _SECRET_CREDS
+    with _SECRET_CREDS_LOCK:
+        if _SECRET_CREDS is not None and _creds_still_valid(_SECRET_CREDS):
+            return _SECRET_CREDS
+        _SECRET_CREDS = _fetch_creds_from_secret_manager()
+        return _SECRET_CREDS
+
+def _fetch_creds_from_secret_manager() -> Optional[Credentials]:
+    """Access the latest secret version and build credentials from it, bypassing the cache."""
+    _load_google()
     if not HAS_SECRET_MANAGER:
         error_msg = "Secret Manager not available (google-cloud-secret-manager not installed)"
-        print(f"⚠️ {error_msg}")
+        logger.warning("⚠️ %s", error_msg)
         raise ValueError(error_msg)
     
     try:
-        client = secretmanager.SecretManagerServiceClient()
+        client = _get_secret_manager_client()
         secret_path = f"projects/{GOOGLE_CLOUD_PROJECT}/secrets/{DRIVE_TOKEN_SECRET_NAME}"
         
         # Get the latest version of the secret
         version_path = f"{secret_path}/versions/latest"
-        print(f"🔍 Attempting to access Secret Manager: {version_path}")
-        print(f"   Project: {GOOGLE_CLOUD_PROJECT}")
-        print(f"   Secret Name: {DRIVE_TOKEN_SECRET_NAME}")
+        logger.debug(
+            "🔍 Attempting to access Secret Manager: %s (project: %s, secret: %s)",
+            version_path, GOOGLE_CLOUD_PROJECT, DRIVE_TOKEN_SECRET_NAME
+        )
         
         response = client.access_secret_version(request={"name": version_path})
         
         # Parse token data
         token_data = json.loads(response.payload.data.decode("UTF-8"))
-        print(f"✅ Successfully retrieved token from Secret Manager")
+        logger.debug("✅ Successfully retrieved token from Secret Manager")
         
         # Validate required fields
         if not token_data.get("token") or not token_data.get("refresh_token"):
             error_msg = f"Secret Manager token missing required fields (token or refresh_token). Secret: {DRIVE_TOKEN_SECRET_NAME}, Project: {GOOGLE_CLOUD_PROJECT}"
-            print(f"❌ {error_msg}")
+            logger.error("❌ %s", error_msg)
             raise ValueError(error_msg)
         
         # Create credentials object
@@ -73,16 +165,16 @@ def _get_creds_from_secret_manager() -> Optional[Credentials]:
         # If token expired, refresh it
         if creds.expired and creds.refresh_token:
             try:
-                print("🔄 Refreshing expired Secret Manager token...")
+                logger.info("🔄 Refreshing expired Secret Manager token...")
                 creds.refresh(Request())
-                print("✅ Token refreshed successfully")
+                logger.info("✅ Token refreshed successfully")
             except Exception as e:
-                print(f"❌ Failed to refresh Secret Manager token: {str(e)}")
-                import traceback
-                traceback.print_exc()
+                logger.error("❌ Failed to refresh Secret Manager token: %s", e)
+                # Full traceback only when debugging; the error above is enough in production
+                logger.debug("Secret Manager token refresh traceback", exc_info=True)
                 raise ValueError(f"Google Drive token expired and could not be refreshed: {str(e)}")
         
-        print("✅ Using credentials from Secret Manager (investments@wyldvc.com)")
+        logger.info("✅ Using credentials from Secret Manager (investments@wyldvc.com)")
         return creds
         
     except ValueError:
@@ -97,31 +189,46 @@ def _get_creds_from_secret_manager() -> Optional[Credentials]:
             f"Secret: {DRIVE_TOKEN_SECRET_NAME}. "
             f"Please verify the secret exists and the Cloud Run service account has 'Secret Manager Secret Accessor' role."
         )
-        print(f"❌ Secret Manager error: {error_type}: {error_msg}")
-        print(f"   Project: {GOOGLE_CLOUD_PROJECT}")
-        print(f"   Secret Name: {DRIVE_TOKEN_SECRET_NAME}")
-        import traceback
-        traceback.print_exc()
+        logger.error(
+            "❌ Secret Manager error: %s: %s (project: %s, secret: %s)",
+            error_type, error_msg, GOOGLE_CLOUD_PROJECT, DRIVE_TOKEN_SECRET_NAME
+        )
+        logger.debug("Secret Manager access traceback", exc_info=True)
         raise ValueError(detailed_error)
 
 def _get_user_creds(user: User, db: Session) -> Credentials:
     """
     Build Google Credentials object from Secret Manager or user's stored tokens.
     Priority: Secret Manager first (investments@wyldvc.com), then user tokens.
+    Credentials are cached per user and reused until they are close to expiry.
     """
+    with _CREDS_CACHE_LOCK:
+        cached_creds = _CREDS_CACHE.get(user.id)
+    if cached_creds is not None and _creds_still_valid(cached_creds):
+        return cached_creds
+
+    creds = _load_user_creds(user, db)
+    with _CREDS_CACHE_LOCK:
+        _CREDS_CACHE[user.id] = creds
+    return creds
+
+def _load_user_creds(user: User, db: Session) -> Credentials:
+    """Fetch credentials from Secret Manager or the user's stored tokens, bypassing the cache."""
+    _load_google()
     # Try Secret Manager first (for investments@wyldvc.com - this is the primary method)
     secret_manager_error = None
-    try:
-        secret_manager_creds = _get_creds_from_secret_manager()
-        if secret_manager_creds:
-            return secret_manager_creds
-    except ValueError as e:
-        # Capture the Secret Manager error for inclusion in final error message
-        secret_manager_error = str(e)
-        print(f"⚠️ Secret Manager failed: {secret_manager_error}")
+    if USE_SECRET_MANAGER:
+        try:
+            secret_manager_creds = _get_creds_from_secret_manager()
+            if secret_manager_creds:
+                return secret_manager_creds
+        except ValueError as e:
+            # Capture the Secret Manager error for inclusion in final error message
+            secret_manager_error = str(e)
+            logger.warning("⚠️ Secret Manager failed: %s", secret_manager_error)
     
     # Fall back to user's stored tokens (only if Secret Manager fails)
-    print("⚠️ Secret Manager token not available, trying user tokens...")
+    logger.info("Secret Manager token not available, trying user tokens...")
     token_record = (
         db.query(GoogleToken).filter(GoogleToken.user_id == user.id).first()
     )
@@ -131,6 +238,8 @@ def _get_user_creds(user: User, db: Session) -> Credentials:
         )
         if secret_manager_error:
             error_msg += f"Secret Manager error: {secret_manager_error}. "
+        elif not USE_SECRET_MANAGER:
+            error_msg += "Secret Manager is disabled (USE_SECRET_MANAGER=0). "
         else:
             error_msg += (
                 "Secret Manager token (investments@wyldvc.com) is not configured. "
@@ -141,6 +250,11 @@ def _get_user_creds(user: User, db: Session) -> Credentials:
         )
         raise ValueError(error_msg)
 
+    # google-auth compares expiry as naive UTC; the column is timezone-aware
+    expiry = token_record.expiry
+    if expiry is not None and expiry.tzinfo is not None:
+        expiry = expiry.astimezone(timezone.utc).replace(tzinfo=None)
+
     creds = Credentials(
         token=token_record.access_token,
         refresh_token=token_record.refresh_token,
@@ -148,28 +262,120 @@ def _get_user_creds(user: User, db: Session) -> Credentials:
         client_id=GOOGLE_CLIENT_ID,
         client_secret=GOOGLE_CLIENT_SECRET,
         scopes=SCOPES,
+        expiry=expiry,
     )
 
-    # If token refreshed, update DB
+    # If token refreshed, update DB - only when the token actually changed, and only if no
+    # other worker has already stored a newer one (compare-and-set on the old token)
     if creds.expired and creds.refresh_token:
+        previous_token = token_record.access_token
         creds.refresh(Request())
-        token_record.access_token = creds.token
-        token_record.expiry = creds.expiry
-        db.commit()
+        if creds.token != previous_token:
+            try:
+                db.query(GoogleToken).filter(
+                    GoogleToken.id == token_record.id,
+                    GoogleToken.access_token == previous_token
+                ).update({
+                    GoogleToken.access_token: creds.token,
+                    GoogleToken.expiry: creds.expiry.replace(tzinfo=timezone.utc) if creds.expiry else None,
+                }, synchronize_session=False)
+                db.commit()
+            except SQLAlchemyError as e:
+                db.rollback()
+                logger.warning("⚠️ Could not persist refreshed Google token: %s", e)
 
-    print("✅ Using user's Google tokens")
+    logger.info("✅ Using user's Google tokens")
     return creds
 
+def _invalidate_user_creds(user_id: int) -> None:
+    """Drop cached credentials and API clients so the next call fetches fresh tokens."""
+    global _SECRET_CREDS
+    with _CREDS_CACHE_LOCK:
+        _CREDS_CACHE.pop(user_id, None)
+    with _SECRET_CREDS_LOCK:
+        _SECRET_CREDS = None
+    services = getattr(_service_local, "services", None)
+    if services:
+        for key in [key for key in services if key[0] == user_id]:
+            del services[key]
+
+def _is_unauthorized(error: Exception) -> bool:
+    """True if error is an HTTP 401 from a Google API call"""
+    return getattr(getattr(error, "resp", None), "status", None) == 401
+
+def _retry_on_unauthorized(func):
+    """
+    Retry a Google API operation once with fresh credentials if it fails with HTTP 401
+    (e.g. the cached token was revoked or rotated before its expiry).
+    The whole function runs again, so only use this for operations that are safe to
+    repeat (lookups); multi-step writes use _execute_with_reauth per call instead.
+    """
+    @wraps(func)
+    def wrapper(user: User, db: Session, *args, **kwargs):
+        try:
+            return func(user, db, *args, **kwargs)
+        except Exception as e:
+            if not _is_unauthorized(e):
+                raise
+            logger.warning("⚠️ Google API returned 401, refreshing credentials and retrying: %s", e)
+            _invalidate_user_creds(user.id)
+            return func(user, db, *args, **kwargs)
+    return wrapper
+
+def _execute_with_reauth(user: User, db: Session, service, service_name: str, version: str, make_request):
+    """
+    Execute make_request(service). If it fails with HTTP 401, refresh the credentials,
+    rebuild the client and send only this request again, so earlier steps of the
+    operation (such as creating the document) are not repeated.
+    Returns (response, service) where service is the client that succeeded.
+    """
+    try:
+        return make_request(service).execute(num_retries=GOOGLE_API_RETRIES), service
+    except Exception as e:
+        if not _is_unauthorized(e):
+            raise
+        logger.warning("⚠️ Google API returned 401, refreshing credentials and retrying: %s", e)
+        _invalidate_user_creds(user.id)
+        service = _get_service(user, db, service_name, version)
+        return make_request(service).execute(num_retries=GOOGLE_API_RETRIES), service
+
+def _get_service(user: User, db: Session, service_name: str, version: str, creds: Optional[Credentials] = None):
+    """
+    Return a cached API client for the user's current credentials, building it if needed.
+    creds may be passed when the caller has already looked them up.
+    """
+    if creds is None:
+        creds = _get_user_creds(user, db)
+    _load_google()
+    services = getattr(_service_local, "services", None)
+    if services is None:
+        services = _service_local.services = {}
+
+    key = (user.id, service_name, version)
+    cached = services.get(key)
+    if cached is not None and cached[0] is creds:
+        return cached[1]
+
+    # Use the discovery documents bundled with googleapiclient instead of fetching them
+    service = build(service_name, version, credentials=creds,
+                    cache_discovery=False, static_discovery=True)
+    services[key] = (creds, service)
+    return service
+
 def get_drive_service(user: User, db: Session):
     """Return an authenticated Google Drive service client."""
-    creds = _get_user_creds(user, db)
-    return build("drive", "v3", credentials=creds)
+    return _get_service(user, db, "drive", "v3")
 
 def get_docs_service(user: User, db: Session):
     """Return an authenticated Google Docs service client."""
+    return _get_service(user, db, "docs", "v1")
+
+def get_docs_and_drive_services(user: User, db: Session):
+    """Return (docs, drive) service clients built from a single credentials lookup."""
     creds = _get_user_creds(user, db)
-    return build("docs", "v1", credentials=creds)
+    return _get_service(user, db, "docs", "v1", creds), _get_service(user, db, "drive", "v3", creds)
 
+@_retry_on_unauthorized
 def search_files(user: User, db: Session, query: str, max_results: int = 20):
     """
     Search for files in Google Drive for the given user.
@@ -179,19 +385,30 @@ def search_files(user: User, db: Session, query: str, max_results: int = 20):
         q=f"name contains '{query}' and trashed = false",
         pageSize=max_results,
         fields="files(id, name, mimeType, webViewLink, createdTime, modifiedTime)"
-    ).execute()
+    ).execute(num_retries=GOOGLE_API_RETRIES)
     return results.get("files", [])
 
 def _get_drive_id(service, drive_name: str) -> str:
     """Get a shared drive ID by name."""
-    response = service.drives().list().execute()
+    cache_key = drive_name.lower()
+    drive_id = _DRIVE_ID_CACHE.get(cache_key)
+    if drive_id is not None:
+        return drive_id
+
+    response = service.drives().list(fields="drives(id, name)").execute(num_retries=GOOGLE_API_RETRIES)
     for d in response.get('drives', []):
-        if d['name'].lower() == drive_name.lower():
+        if d['name'].lower() == cache_key:
+            _DRIVE_ID_CACHE[cache_key] = d['id']
             return d['id']
     raise ValueError(f"Shared drive '{drive_name}' not found")
 
 def _get_folder_id(service, folder_name: str, drive_id: str, parent_id: str = None) -> str:
     """Get a folder ID by name, optionally within a parent folder."""
+    cache_key = (folder_name, drive_id, parent_id)
+    folder_id = _FOLDER_ID_CACHE.get(cache_key)
+    if folder_id is not None:
+        return folder_id
+
     query = f"mimeType='application/vnd.google-apps.folder' and name='{folder_name}'"
     if parent_id:
         query += f" and '{parent_id}' in parents"
@@ -203,11 +420,12 @@ def _get_folder_id(service, folder_name: str, drive_id: str, parent_id: str = No
         includeItemsFromAllDrives=True,
         supportsAllDrives=True,
         fields="files(id, name)"
-    ).execute()
+    ).execute(num_retries=GOOGLE_API_RETRIES)
 
     folders = results.get('files', [])
     if not folders:
         raise ValueError(f"Folder '{folder_name}' not found (parent: {parent_id})")
+    _FOLDER_ID_CACHE[cache_key] = folders[0]['id']
     return folders[0]['id']
 
 def create_doc(user: User, db: Session, title: str, content: dict):
@@ -217,27 +435,98 @@ def create_doc(user: User, db: Session, title: str, content: dict):
     service = get_docs_service(user, db)
 
     # Create doc
-    doc = service.documents().create(body={"title": title}).execute()
+    doc, service = _execute_with_reauth(
+        user, db, service, "docs", "v1",
+        lambda docs: docs.documents().create(body={"title": title})
+    )
     doc_id = doc["documentId"]
 
-    # Insert content
-    requests = []
-    for section, text in content.items():
-        requests.append({
-            "insertText": {
-                "location": {"index": 1},
-                "text": f"{section}\n{text}\n\n"
-            }
-        })
-
-    if requests:
-        service.documents().batchUpdate(
-            documentId=doc_id,
-            body={"requests": requests}
-        ).execute()
+    # Insert all content with a single insertText so the server applies one edit
+    full_text = "".join(f"{section}\n{text}\n\n" for section, text in content.items())
+
+    if full_text:
+        _execute_with_reauth(
+            user, db, service, "docs", "v1",
+            lambda docs: docs.documents().batchUpdate(
+                documentId=doc_id,
+                body={"requests": [{
+                    "insertText": {
+                        "location": {"index": 1},
+                        "text": full_text
+                    }
+                }]}
+            )
+        )
 
     return f"https://docs.google.com/document/d/{doc_id}/edit"
 
+def _share_with_domain(drive_service, doc_id: str) -> None:
+    """Share a document with the wyldvc.com domain (anyone in the domain gets edit access)"""
+    try:
+        permission = {
+            'type': 'domain',
+            'role': 'writer',
+            'domain': 'wyldvc.com'
+        }
+        drive_service.permissions().create(
+            fileId=doc_id,
+            body=permission,
+            supportsAllDrives=True
+        ).execute(num_retries=GOOGLE_API_RETRIES)
+        logger.info("✅ Document shared with wyldvc.com domain")
+    except Exception as e:
+        logger.warning("Could not share document with domain: %s", e)
+
+def _utf16_len(text: str) -> int:
+    """Length of text in UTF-16 code units, the unit Google Docs indices count in"""
+    return len(text.encode('utf-16-le')) // 2
+
+def _heading_block(block: Dict[str, Any], start_idx: int):
+    """Single-line heading (title, subtitle, section/subsection/bold header) on its own line"""
+    text = block.get('content', '')
+    return f"{text}\n", [(block['type'], start_idx, start_idx + _utf16_len(text), [])]
+
+def _paragraph_block(block: Dict[str, Any], start_idx: int):
+    """Paragraph followed by a blank line, with potential inline bold ranges; empty ones are dropped"""
+    content = block.get('content', '')
+    text = content.strip()
+    if not text:
+        return "", []
+    # bold_ranges are character offsets into the unstripped content; convert them to
+    # UTF-16 offsets into the inserted text
+    lead = len(content) - len(content.lstrip())
+    bold_ranges = [
+        (_utf16_len(text[:max(bold_start - lead, 0)]), _utf16_len(text[:max(bold_end - lead, 0)]))
+        for bold_start, bold_end in block.get('bold_ranges', [])
+    ]
+    return f"{text}\n\n", [('paragraph', start_idx, start_idx + _utf16_len(text), bold_ranges)]
+
+def _bullet_list_block(block: Dict[str, Any], start_idx: int):
+    """One "• item" line per non-empty item, followed by a blank line"""
+    lines = []
+    ranges = []
+    for item in block.get('items', []):
+        text = str(item).strip()
+        if text:
+            bullet_text = f"• {text}"
+            bullet_len = _utf16_len(bullet_text)
+            ranges.append(('bullet', start_idx, start_idx + bullet_len, []))
+            lines.append(f"{bullet_text}\n")
+            start_idx += bullet_len + 1
+    lines.append("\n")
+    return "".join(lines), ranges
+
+# Block type -> handler returning (text to insert, formatting ranges) for a block starting at start_idx
+_BLOCK_HANDLERS = {
+    'title': _heading_block,
+    'subtitle': _heading_block,
+    'section_heading': _heading_block,
+    'subsection_header': _heading_block,
+    'bold_header': _heading_block,
+    'paragraph': _paragraph_block,
+    'bullet_list': _bullet_list_block,
+}
+
 def create_google_doc_from_blocks(user: User, db: Session, title: str, blocks: List[Dict[str, Any]], parent_folder_id: str = None) -> str:
     """
     Create a Google Doc from structured blocks and optionally move it to a folder.
@@ -252,365 +541,95 @@ def create_google_doc_from_blocks(user: User, db: Session, title: str, blocks: L
     Returns:
         Google Doc web view URL
     """
-    docs_service = get_docs_service(user, db)
-    drive_service = get_drive_service(user, db)
+    docs_service, drive_service = get_docs_and_drive_services(user, db)
     
     # Create empty document
-    doc = docs_service.documents().create(body={"title": title}).execute()
+    doc, docs_service = _execute_with_reauth(
+        user, db, docs_service, "docs", "v1",
+        lambda docs: docs.documents().create(body={"title": title})
+    )
     doc_id = doc["documentId"]
     
-    # Build content and track formatting positions
-    requests = []
-    current_index = 1  # Start at beginning of document
-    
-    # Track formatting ranges for later application
-    formatting_ranges = []  # (type, start_idx, end_idx, bold_ranges)
-    
-    for block in blocks:
-        block_type = block.get('type')
+    # Sharing only needs the document ID, so run it on a worker thread while the
+    # content is built and written. The Drive client is separate from the Docs
+    # client and is not touched by this thread until the share has finished.
+    share_future = _API_POOL.submit(_share_with_domain, drive_service, doc_id)
+    try:
         
-        if block_type == 'title':
-            # Title: size 12pt, bold
-            text = block.get('content', '')
-            start_idx = current_index
-            requests.append({
-                "insertText": {
-                    "location": {"index": current_index},
-                    "text": f"{text}\n"
-                }
-            })
-            current_index += len(text) + 1
-            formatting_ranges.append(('title', start_idx, current_index - 1, []))
-            
-        elif block_type == 'subtitle':
-            # Subtitle: size 10pt, not bold
-            text = block.get('content', '')
-            start_idx = current_index
-            requests.append({
-                "insertText": {
-                    "location": {"index": current_index},
-                    "text": f"{text}\n"
-                }
-            })
-            current_index += len(text) + 1
-            formatting_ranges.append(('subtitle', start_idx, current_index - 1, []))
-            
-        elif block_type == 'section_heading':
-            # Section heading: size 12pt, bold
-            text = block.get('content', '')
-            start_idx = current_index
-            requests.append({
-                "insertText": {
-                    "location": {"index": current_index},
-                    "text": f"{text}\n"
-                }
-            })
-            current_index += len(text) + 1
-            formatting_ranges.append(('section_heading', start_idx, current_index - 1, []))
-            
-        elif block_type == 'subsection_header':
-            # Subsection header: size 10pt, bold
-            text = block.get('content', '')
-            start_idx = current_index
+        # Build the full document text in one buffer and track formatting positions
+        # (in UTF-16 code units, as Docs counts them)
+        parts = []
+        current_index = 1  # Start at beginning of document
+        
+        # Track formatting ranges for later application
+        formatting_ranges = []  # (type, start_idx, end_idx, bold_ranges)
+        
+        for block in blocks:
+            handler = _BLOCK_HANDLERS.get(block.get('type'))
+            if handler is None:
+                # Unknown types and legacy 'table' blocks (kept for backward compatibility) are skipped
+                continue
+            text, ranges = handler(block, current_index)
+            parts.append(text)
+            formatting_ranges.extend(ranges)
+            current_index += _utf16_len(text)
+        
+        # One insertText for the whole body instead of one per block
+        requests = []
+        if parts:
             requests.append({
                 "insertText": {
-                    "location": {"index": current_index},
-                    "text": f"{text}\n"
+                    "location": {"index": 1},
+                    "text": "".join(parts)
                 }
             })
-            current_index += len(text) + 1
-            formatting_ranges.append(('subsection_header', start_idx, current_index - 1, []))
-            
-        elif block_type == 'bold_header':
-            # Bold header: size 10pt, bold, new line
-            text = block.get('content', '')
-            start_idx = current_index
-            requests.append({
-                "insertText": {
-                    "location": {"index": current_index},
-                    "text": f"{text}\n"
+        
+        # Build format requests straight from the ranges recorded during insertion;
+        # the indices are exact, so there is no need to read the document back
+        format_requests = []
+        for block_type, start_idx, end_idx, bold_ranges in formatting_ranges:
+            if start_idx >= end_idx:
+                continue
+            format_requests.append({
+                "updateTextStyle": {
+                    "range": {
+                        "startIndex": start_idx,
+                        "endIndex": end_idx
+                    },
+                    "textStyle": _BLOCK_STYLES[block_type],
+                    "fields": _BLOCK_FIELDS
                 }
             })
-            current_index += len(text) + 1
-            formatting_ranges.append(('bold_header', start_idx, current_index - 1, []))
             
-        elif block_type == 'paragraph':
-            # Paragraph: size 10pt, not bold (with potential inline bold ranges)
-            text = block.get('content', '').strip()
-            bold_ranges = block.get('bold_ranges', [])
-            if text:
-                start_idx = current_index
-                requests.append({
-                    "insertText": {
-                        "location": {"index": current_index},
-                        "text": f"{text}\n\n"
-                    }
-                })
-                current_index += len(text) + 2
-                formatting_ranges.append(('paragraph', start_idx, current_index - 2, bold_ranges))
-                
-        elif block_type == 'bullet_list':
-            # Bullet list: size 10pt, not bold
-            items = block.get('items', [])
-            for item in items:
-                text = str(item).strip()
-                if text:
-                    requests.append({
-                        "insertText": {
-                            "location": {"index": current_index},
-                            "text": f"• {text}\n"
+            # Apply inline bold formatting for paragraph ranges
+            for bold_start, bold_end in bold_ranges:
+                bold_start_idx = start_idx + bold_start
+                bold_end_idx = start_idx + bold_end
+                if bold_start_idx < bold_end_idx <= end_idx:
+                    format_requests.append({
+                        "updateTextStyle": {
+                            "range": {
+                                "startIndex": bold_start_idx,
+                                "endIndex": bold_end_idx
+                            },
+                            "textStyle": _INLINE_BOLD_STYLE,
+                            "fields": "bold"
                         }
                     })
-                    current_index += len(f"• {text}\n")
-            requests.append({
-                "insertText": {
-                    "location": {"index": current_index},
-                    "text": "\n"
-                }
-            })
-            current_index += 1
-            
-        elif block_type == 'table':
-            # Table: skip - we're not using tables anymore
-            # This block type is kept for backward compatibility but won't be processed
-            pass
-    
-    # Execute text insertion requests first
-    if requests:
-        docs_service.documents().batchUpdate(
-            documentId=doc_id,
-            body={"requests": requests}
-        ).execute()
-    
-    # Get updated document to apply formatting
-    document = docs_service.documents().get(documentId=doc_id).execute()
-    body = document.get('body', {})
-    content = body.get('content', [])
-    
-    # Build format requests by walking through document and matching with blocks
-    format_requests = []
-    block_idx = 0
-    
-    # Walk through document content and match with blocks
-    for element in content:
-        if 'paragraph' in element:
-            para = element['paragraph']
-            if 'elements' in para and len(para['elements']) > 0:
-                # Get the text run to find its indices
-                first_elem = para['elements'][0]
-                if 'textRun' in first_elem:
-                    start_idx = first_elem.get('startIndex', 0)
-                    text_run = first_elem['textRun']
-                    text_content = text_run.get('content', '')
-                    
-                    # Find the end index - strip trailing newlines but keep the range valid
-                    text_stripped = text_content.rstrip('\n')
-                    if not text_stripped:
-                        # Empty paragraph, skip it
-                        continue
-                    
-                    end_idx = start_idx + len(text_stripped)
-                    
-                    # Skip if empty range
-                    if start_idx >= end_idx:
-                        continue
-                    
-                    # Match with block based on position
-                    # Skip empty paragraph blocks
-                    while block_idx < len(blocks):
-                        block = blocks[block_idx]
-                        block_type = block.get('type')
-                        
-                        # Skip empty paragraph blocks
-                        if block_type == 'paragraph':
-                            text = block.get('content', '').strip()
-                            if not text:
-                                block_idx += 1
-                                continue
-                            break
-                        else:
-                            break
-                    
-                    if block_idx >= len(blocks):
-                        continue
-                    
-                    block = blocks[block_idx]
-                    block_type = block.get('type')
-                    
-                    if block_type in ['title', 'section_heading']:
-                        # Size 12pt, bold
-                        format_requests.append({
-                            "updateTextStyle": {
-                                "range": {
-                                    "startIndex": start_idx,
-                                    "endIndex": end_idx
-                                },
-                                "textStyle": {
-                                    "fontSize": {"magnitude": 12, "unit": "PT"},
-                                    "bold": True
-                                },
-                                "fields": "fontSize,bold"
-                            }
-                        })
-                        block_idx += 1
-                        
-                    elif block_type == 'subtitle':
-                        # Size 10pt, not bold
-                        format_requests.append({
-                            "updateTextStyle": {
-                                "range": {
-                                    "startIndex": start_idx,
-                                    "endIndex": end_idx
-                                },
-                                "textStyle": {
-                                    "fontSize": {"magnitude": 10, "unit": "PT"},
-                                    "bold": False
-                                },
-                                "fields": "fontSize,bold"
-                            }
-                        })
-                        block_idx += 1
-                        
-                    elif block_type == 'subsection_header':
-                        # Size 10pt, bold
-                        format_requests.append({
-                            "updateTextStyle": {
-                                "range": {
-                                    "startIndex": start_idx,
-                                    "endIndex": end_idx
-                                },
-                                "textStyle": {
-                                    "fontSize": {"magnitude": 10, "unit": "PT"},
-                                    "bold": True
-                                },
-                                "fields": "fontSize,bold"
-                            }
-                        })
-                        block_idx += 1
-                        
-                    elif block_type == 'bold_header':
-                        # Size 10pt, bold (detected title patterns)
-                        format_requests.append({
-                            "updateTextStyle": {
-                                "range": {
-                                    "startIndex": start_idx,
-                                    "endIndex": end_idx
-                                },
-                                "textStyle": {
-                                    "fontSize": {"magnitude": 10, "unit": "PT"},
-                                    "bold": True
-                                },
-                                "fields": "fontSize,bold"
-                            }
-                        })
-                        block_idx += 1
-                        
-                    elif block_type == 'paragraph':
-                        # Size 10pt, not bold (with inline bold ranges)
-                        text = block.get('content', '').strip()
-                        bold_ranges = block.get('bold_ranges', [])
-                        if text:
-                            # Set base style
-                            format_requests.append({
-                                "updateTextStyle": {
-                                    "range": {
-                                        "startIndex": start_idx,
-                                        "endIndex": end_idx
-                                    },
-                                    "textStyle": {
-                                        "fontSize": {"magnitude": 10, "unit": "PT"},
-                                        "bold": False
-                                    },
-                                    "fields": "fontSize,bold"
-                                }
-                            })
-                            # Apply bold formatting for ranges
-                            for bold_start, bold_end in bold_ranges:
-                                if bold_start < len(text) and bold_end <= len(text):
-                                    bold_start_idx = start_idx + bold_start
-                                    bold_end_idx = start_idx + bold_end
-                                    if bold_start_idx < bold_end_idx and bold_end_idx <= end_idx:
-                                        format_requests.append({
-                                            "updateTextStyle": {
-                                                "range": {
-                                                    "startIndex": bold_start_idx,
-                                                    "endIndex": bold_end_idx
-                                                },
-                                                "textStyle": {
-                                                    "bold": True
-                                                },
-                                                "fields": "bold"
-                                            }
-                                        })
-                            block_idx += 1
-    
-    # Handle bullet list items separately - they appear as separate paragraphs
-    bullet_block_idx = 0
-    bullet_item_idx = 0
-    for element in content:
-        if 'paragraph' in element:
-            para = element['paragraph']
-            if 'elements' in para and len(para['elements']) > 0:
-                first_elem = para['elements'][0]
-                if 'textRun' in first_elem:
-                    text_run = first_elem['textRun']
-                    text_content = text_run.get('content', '')
-                    # Check if it's a bullet (starts with bullet character)
-                    if text_content.strip().startswith('•'):
-                        start_idx = first_elem.get('startIndex', 0)
-                        end_idx = start_idx + len(text_content.rstrip('\n'))
-                        
-                        if start_idx < end_idx:
-                            format_requests.append({
-                                "updateTextStyle": {
-                                    "range": {
-                                        "startIndex": start_idx,
-                                        "endIndex": end_idx
-                                    },
-                                    "textStyle": {
-                                        "fontSize": {"magnitude": 10, "unit": "PT"},
-                                        "bold": False
-                                    },
-                                    "fields": "fontSize,bold"
-                                }
-                            })
-    
-    # Apply formatting
-    if format_requests:
-        # Filter out any requests with invalid ranges
-        valid_requests = []
-        for req in format_requests:
-            if 'updateTextStyle' in req:
-                range_obj = req['updateTextStyle']['range']
-                if range_obj['startIndex'] < range_obj['endIndex']:
-                    valid_requests.append(req)
         
-        if valid_requests:
-            # Process in chunks
-            chunk_size = 100
-            for i in range(0, len(valid_requests), chunk_size):
-                chunk = valid_requests[i:i + chunk_size]
-                docs_service.documents().batchUpdate(
-                    documentId=doc_id,
-                    body={"requests": chunk}
-                ).execute()
-    
-    # Tables are now handled as formatted text, so no table insertion needed
-    
-    # Share with domain (wyldvc.com) - make it available to anyone in the domain with edit access
-    try:
-        permission = {
-            'type': 'domain',
-            'role': 'writer',
-            'domain': 'wyldvc.com'
-        }
-        drive_service.permissions().create(
-            fileId=doc_id,
-            body=permission,
-            supportsAllDrives=True
-        ).execute()
-        print(f"✅ Document shared with wyldvc.com domain")
-    except Exception as e:
-        print(f"Warning: Could not share document with domain: {e}")
+        # Insert the text and apply all formatting in a single batchUpdate;
+        # requests are applied in order, so the styles see the inserted text
+        requests.extend(format_requests)
+        if requests:
+            _execute_with_reauth(
+                user, db, docs_service, "docs", "v1",
+                lambda docs: docs.documents().batchUpdate(documentId=doc_id, body={"requests": requests})
+            )
+        
+        # Tables are now handled as formatted text, so no table insertion needed
+    finally:
+        # Wait for the domain share before returning, even on failure, so the
+        # worker thread is done with the Drive client before anyone else can use it
+        share_future.result()
     
     return f"https://docs.google.com/document/d/{doc_id}/edit"
\ No newline at end of file
@@ -1,29 +1,117 @@
 import os
+import json
+import time
+import httpx
 from openai import OpenAI
-from typing import List, Dict, Any
+from functools import lru_cache
+from typing import List, Dict, Any, Iterator, Union
 from dotenv import load_dotenv
 
 load_dotenv()
 
+# HTTP/2 needs the optional h2 package; fall back to pooled HTTP/1.1 without it
+try:
+    import h2  # noqa: F401
+    HAS_HTTP2 = True
+except ImportError:
+    HAS_HTTP2 = False
+
+# tiktoken gives exact prompt sizes; without it token counts are estimated from length
+try:
+    import tiktoken
+    HAS_TIKTOKEN = True
+except ImportError:
+    HAS_TIKTOKEN = False
+
+# Shared connection pool so concurrent section generation reuses TLS connections
+# instead of re-handshaking; idle connections are kept longer than httpx's 5s default
+# because completions are spaced out by prompt building and RAG lookups
+_http_client = httpx.Client(
+    http2=HAS_HTTP2,
+    limits=httpx.Limits(max_keepalive_connections=20, max_connections=100, keepalive_expiry=60),
+    timeout=httpx.Timeout(600.0, connect=5.0),
+)
+
+# The SDK retries 429s and 5xx with exponential backoff; memo sections are generated
+# concurrently, so allow a few more attempts than the default of 2
+OPENAI_MAX_RETRIES = int(os.getenv("OPENAI_MAX_RETRIES", "5"))
+
 # Initialize OpenAI client
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"), http_client=_http_client, max_retries=OPENAI_MAX_RETRIES)
 
-def generate_text(
-    prompt: str,
-    system_message: str = None,
-    model: str = "gpt-4-turbo-preview",
-    max_tokens: int = 3000,
-    temperature: float = 0.7
-) -> str:
+@lru_cache(maxsize=None)
+def _get_encoding():
+    """Tokenizer used by the gpt-4o family (None if it cannot be loaded)"""
+    if not HAS_TIKTOKEN:
+        return None
+    try:
+        return tiktoken.get_encoding("o200k_base")
+    except Exception:
+        return None
+
+@lru_cache(maxsize=1024)
+def count_tokens(text: str) -> int:
     """
-    Generate text using GPT API.
+    Count the tokens in text for the gpt-4o family of models.
+    Falls back to ~4 characters per token when tiktoken is unavailable. Cached because
+    the same system messages, prompts and retrieved chunks are measured repeatedly.
     """
+    encoding = _get_encoding()
+    if encoding is None:
+        return (len(text) + 3) // 4
+    return len(encoding.encode(text, disallowed_special=()))
+
+def _build_messages(prompt: str, system_message: str = None) -> List[Dict[str, str]]:
+    """Build the chat messages for a single prompt."""
     messages = []
     
     if system_message:
         messages.append({"role": "system", "content": system_message})
     
     messages.append({"role": "user", "content": prompt})
+    return messages
+
+def _stream_text(**request) -> Iterator[str]:
+    """
+    Yield content deltas from a streamed chat completion as they arrive.
+    Closing the iterator early closes the HTTP response, which stops the generation.
+    """
+    response = None
+    try:
+        response = client.chat.completions.create(stream=True, **request)
+        for chunk in response:
+            if chunk.choices:
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    yield delta
+    except Exception as e:
+        raise Exception(f"GPT API error: {str(e)}")
+    finally:
+        if response is not None:
+            response.response.close()
+
+def generate_text(
+    prompt: str,
+    system_message: str = None,
+    model: str = "gpt-4o",
+    max_tokens: int = 3000,
+    temperature: float = 0.7,
+    stream: bool = False
+) -> Union[str, Iterator[str]]:
+    """
+    Generate text using GPT API.
+    With stream=True, returns an iterator of text chunks as they are generated
+    (unstripped) instead of waiting for the full completion.
+    """
+    messages = _build_messages(prompt, system_message)
+    
+    if stream:
+        return _stream_text(
+            model=model,
+            messages=messages,
+            max_tokens=max_tokens,
+            temperature=temperature
+        )
     
     try:
         response = client.chat.completions.create(
@@ -38,3 +126,73 @@ def generate_text(
     except Exception as e:
         raise Exception(f"GPT API error: {str(e)}")
 
+def generate_text_batch(
+    prompts: Dict[str, str],
+    system_message: str = None,
+    model: str = "gpt-4o",
+    max_tokens: int = 3000,
+    temperature: float = 0.7,
+    poll_interval: float = 15.0,
+    timeout: float = 3600.0,
+    models: Dict[str, str] = None
+) -> Dict[str, str]:
+    """
+    Generate text for several prompts through the OpenAI Batch API (half the token
+    price of regular completions, at the cost of minutes of latency).
+    prompts maps a caller-chosen ID to its prompt. Blocks until the batch finishes and
+    returns {id: text} for the requests that succeeded; failed requests are omitted.
+    models optionally overrides model for individual IDs.
+    """
+    models = models or {}
+    lines = [
+        json.dumps({
+            "custom_id": custom_id,
+            "method": "POST",
+            "url": "/v1/chat/completions",
+            "body": {
+                "model": models.get(custom_id, model),
+                "messages": _build_messages(prompt, system_message),
+                "max_tokens": max_tokens,
+                "temperature": temperature
+            }
+        })
+        for custom_id, prompt in prompts.items()
+    ]
+    if not lines:
+        return {}
+    
+    try:
+        input_file = client.files.create(
+            file=("batch_input.jsonl", "\n".join(lines).encode("utf-8")),
+            purpose="batch"
+        )
+        batch = client.batches.create(
+            input_file_id=input_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h"
+        )
+        
+        deadline = time.monotonic() + timeout
+        while batch.status not in ("completed", "failed", "expired", "cancelled"):
+            if time.monotonic() > deadline:
+                client.batches.cancel(batch.id)
+                raise TimeoutError(f"batch {batch.id} did not finish within {timeout:.0f}s")
+            time.sleep(poll_interval)
+            batch = client.batches.retrieve(batch.id)
+        
+        if batch.status != "completed" or not batch.output_file_id:
+            raise RuntimeError(f"batch {batch.id} ended with status '{batch.status}'")
+        
+        output = client.files.content(batch.output_file_id).text
+    except Exception as e:
+        raise Exception(f"GPT batch API error: {str(e)}")
+    
+    results = {}
+    for line in output.splitlines():
+        if not line.strip():
+            continue
+        item = json.loads(line)
+        response = item.get("response") or {}
+        if response.get("status_code") == 200:
+            results[item["custom_id"]] = response["body"]["choices"][0]["message"]["content"].strip()
+    return results
@@ -1,18 +1,67 @@
 import json
+import logging
 import os
-from typing import Dict, Any, List, Optional
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Dict, Any, List, Optional, Callable, Tuple
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from sqlalchemy.orm import Session
-from backend.db.models import MemoRequest, MemoSection, Source  # ADD Source
-from backend.services.gpt_service import generate_text
-from backend.services.rag_service import build_company_knowledge_base, retrieve_context_for_section
+from backend.db.models import MemoRequest, MemoSection, MemoSectionCache, Source  # ADD Source
+from backend.services.gpt_service import count_tokens, generate_text, generate_text_batch
+from backend.services.rag_service import build_company_knowledge_base, embed_section_queries, retrieve_chunks_for_sections, retrieve_context_for_section
 import re
 
+# orjson parses the prompts file noticeably faster; fall back to the stdlib without it
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+logger = logging.getLogger(__name__)
+
+# Sections are drafted in parallel; the pool is shared by all memos in the process so
+# the total number of in-flight OpenAI requests stays under the rate limit
+MEMO_SECTION_CONCURRENCY = int(os.getenv("MEMO_SECTION_CONCURRENCY", "8"))
+_SECTION_POOL = ThreadPoolExecutor(max_workers=MEMO_SECTION_CONCURRENCY, thread_name_prefix="memo-section")
+
+# Full memos are not interactive, so they can optionally go through the OpenAI Batch API
+# (half the token cost, but results can take minutes); short memos always use direct calls
+MEMO_USE_BATCH_API = os.getenv("MEMO_USE_BATCH_API", "0") == "1"
+MEMO_BATCH_POLL_INTERVAL = float(os.getenv("MEMO_BATCH_POLL_INTERVAL", "15"))
+MEMO_BATCH_TIMEOUT = float(os.getenv("MEMO_BATCH_TIMEOUT", "3600"))
+
+# Full memo sections are cached by a hash of their exact prompt, so regenerating a memo
+# from unchanged data skips the model; set MEMO_SECTION_CACHE=0 to always regenerate
+MEMO_SECTION_CACHE = os.getenv("MEMO_SECTION_CACHE", "1") == "1"
+
+# Context window of the section models (gpt-4o and gpt-4o-mini). Retrieved context is
+# trimmed so prompt + completion fit, instead of paying for a request that fails with a 400
+MEMO_CONTEXT_WINDOW = int(os.getenv("MEMO_CONTEXT_WINDOW", "128000"))
+# Retrieved context is also capped per section, which bounds prompt cost and latency
+# even when the window would allow more
+MEMO_CONTEXT_TOKEN_BUDGET = int(os.getenv("MEMO_CONTEXT_TOKEN_BUDGET", "6000"))
+# Headroom for the prompt template and chat message framing
+_PROMPT_OVERHEAD_TOKENS = 100
+
+# Cancellation flags for the full memos this process is generating (memo_request_id -> Event)
+_CANCEL_EVENTS: Dict[int, threading.Event] = {}
+
+_PROMPTS_PATH = os.path.join(os.path.dirname(__file__), '..', 'schemas', 'memo_prompts.json')
+
 # Load memo prompts
+@lru_cache(maxsize=None)
 def load_memo_prompts() -> Dict[str, Any]:
-    """Load memo prompts from JSON file"""
-    prompts_path = os.path.join(os.path.dirname(__file__), '..', 'schemas', 'memo_prompts.json')
-    with open(prompts_path, 'r') as f:
-        return json.load(f)
+    """
+    Load memo prompts from JSON file.
+    The file is read once per process (a failed read is retried on the next call);
+    callers share the returned dict and must not modify it.
+    """
+    with open(_PROMPTS_PATH, 'rb') as f:
+        data = f.read()
+    return orjson.loads(data) if HAS_ORJSON else json.loads(data)
 
 def get_stored_company_data(db: Session, source_id: int) -> Dict[str, Any]:
     """Retrieve stored company data for memo generation"""
@@ -31,110 +80,57 @@ def get_stored_company_data(db: Session, source_id: int) -> Dict[str, Any]:
         "drive_data": source.drive_data
     }
 
+# CRM fields included in prompts, with their display labels
+_AFFINITY_FIELD_LABELS = tuple(
+    (field, field.replace('_', ' ').title())
+    for field in (
+        'name', 'stage', 'industry', 'description', 'website',
+        'funding_stage', 'last_funding_amount', 'total_funding',
+        'valuation', 'employees', 'headquarters', 'founded_date'
+    )
+)
+
 def format_affinity_data(affinity_data: Dict[str, Any]) -> str:
     """Format Affinity CRM data for prompts"""
     if not affinity_data:
         return "No CRM data available."
     
-    formatted_sections = []
-    key_fields = [
-        'name', 'stage', 'industry', 'description', 'website',
-        'funding_stage', 'last_funding_amount', 'total_funding',
-        'valuation', 'employees', 'headquarters', 'founded_date'
+    formatted_sections = [
+        f"{label}: {affinity_data[field]}"
+        for field, label in _AFFINITY_FIELD_LABELS
+        if affinity_data.get(field)
     ]
     
-    for field in key_fields:
-        if field in affinity_data and affinity_data[field]:
-            formatted_sections.append(f"{field.replace('_', ' ').title()}: {affinity_data[field]}")
-    
     return "\n".join(formatted_sections) if formatted_sections else "Limited CRM data available."
 
-def generate_memo_section_with_rag(
-    section_key: str,
-    prompt: str,
-    company_data: Dict[str, Any],
-    faiss_index,
-    chunks: List[Dict[str, Any]],
-    db: Session,
-    memo_request_id: int
-) -> Dict[str, Any]:
-    """Generate a single memo section using RAG and GPT"""
+def format_company_header(company_data: Dict[str, Any]) -> str:
+    """Format the company and CRM block that opens every section prompt"""
+    company_name = company_data.get("company_name", "the company")
+    company_description = company_data.get("company_description", "")
+    affinity_section = format_affinity_data(company_data.get("affinity_data", {}))
     
-    try:
-        print(f"Generating section: {section_key}")
-        
-        # Retrieve relevant context using RAG
-        rag_context = retrieve_context_for_section(
-            section_key,
-            prompt,
-            faiss_index,
-            chunks,
-            company_data.get("company_name", ""),
-            top_k=5
-        )
-        
-        # Format Affinity data
-        affinity_section = format_affinity_data(company_data.get("affinity_data", {}))
-        
-        company_name = company_data.get("company_name", "the company")
-        company_description = company_data.get("company_description", "")
-        
-        # Create enhanced prompt with RAG context
-        enhanced_prompt = f"""
+    return f"""
 
 COMPANY: {company_name}
 {f"DESCRIPTION: {company_description}" if company_description else ""}
 
-{prompt}
-
-You are generating a section of a wider memo, so while you should tie everything together at the end, don't have an explicit conclusion section.
-
 === CRM DATA (Source: Crunchbase) ===
 {affinity_section}
 
-=== RELEVANT RESEARCH & DATA (Retrieved via semantic search) ===
-{rag_context['context']}
-
-IMPORTANT INSTRUCTIONS:
-1. Base your response ONLY on the data provided above
-2. When citing information, reference the citation numbers [1], [2], etc.
-3. All CRM data should be cited as "Source: Crunchbase"
-4. Prioritize quantitative data, specific metrics, and statistics
-5. If specific information is not available, clearly state that rather than making assumptions
-6. Include specific numbers, percentages, growth rates, and financial figures when mentioned
-
-SOURCES USED: {len(rag_context['sources'])} unique sources found
 """
-        
-        # Generate content using GPT
-        system_message = """
-You are a venture capital investment analyst at Wyld VC, drafting a data-driven Investment Committee (IC) memo.
-Write in a neutral, factual tone but emphasize analytical insight.
-Always back claims with specific data and citations [1], [2], etc.
-Avoid marketing language or speculation; use quantitative metrics and relative comparisons (e.g., "30% higher than peers").
-Each section must be self-contained, concise (300–500 words), and logically structured for a reader who will skim.
-End each section with a short insight summary (2–3 sentences) highlighting key implications or open questions.
 
-FORMATTING RULES - STRICTLY FOLLOW:
-- Follow the "TITLE FORMATTING RULES" specified in each section's prompt exactly
-- Use ### only for subsection headers (e.g., ### Founder Background)
-- Use **text** for emphasis within paragraphs
-- Do NOT use ## or #### headers
-- For executive_summary and company_snapshot: NO markdown headers at all, only plain paragraphs
-"""
-        
-        content = generate_text(
-            enhanced_prompt,
-            system_message,
-            model="gpt-4-turbo-preview",
-            max_tokens=2000,
-            temperature=0.2
-        )
-        
-        # Add Crunchbase to sources if Affinity data was used
-        sources = rag_context['sources'].copy()
-        if company_data.get("affinity_data"):
-            sources.append("Crunchbase (via Affinity CRM)")
+def _build_memo_section(
+    memo_request_id: int,
+    section_key: str,
+    draft: Callable[[], Tuple[str, List[str]]],
+    label: str = "Section"
+) -> Tuple[MemoSection, Dict[str, Any]]:
+    """
+    Run draft() for a section and build (but do not save) the MemoSection row
+    recording the outcome, along with the section's result dict.
+    """
+    try:
+        content, sources = draft()
         
         # Store the section with source information
         memo_section = MemoSection(
@@ -145,22 +141,17 @@ FORMATTING RULES - STRICTLY FOLLOW:
             status="completed"
         )
         
-        db.add(memo_section)
-        db.commit()
-        db.refresh(memo_section)
-        
-        print(f"✅ Section '{section_key}' generated successfully with {len(sources)} sources")
+        logger.info("✅ %s '%s' generated successfully with %d sources", label, section_key, len(sources))
         
-        return {
+        return memo_section, {
             "status": "success",
             "section_name": section_key,
-            "section_id": memo_section.id,
             "content": content,
             "data_sources_used": sources,
         }
         
     except Exception as e:
-        print(f"❌ Error generating section '{section_key}': {str(e)}")
+        logger.error("❌ Error generating %s '%s': %s", label.lower(), section_key, e)
         
         memo_section = MemoSection(
             memo_request_id=memo_request_id,
@@ -169,72 +160,410 @@ FORMATTING RULES - STRICTLY FOLLOW:
             status="failed",
             error_log=str(e)
         )
-        db.add(memo_section)
-        db.commit()
         
-        return {
-            "status": "failed",  # FIXED
+        return memo_section, {
+            "status": "failed",
             "section_name": section_key,
-            "error": str(e)  # FIXED
+            "error": str(e)
         }
 
-def generate_short_memo_section_with_rag(
+def _save_memo_sections(db: Session, built: List[Tuple[MemoSection, Dict[str, Any]]]) -> None:
+    """Insert built sections in one transaction and fill in section_id on their results (failed ones included)."""
+    db.add_all([memo_section for memo_section, _ in built])
+    db.flush()  # assigns primary keys without a round-trip per row
+    for memo_section, result in built:
+        result["section_id"] = memo_section.id
+    db.commit()
+
+def _reset_memo_sections(db: Session, memo_request_id: int, keep_completed: bool = True) -> List[MemoSection]:
+    """
+    Clear the sections a previous run left for a memo so they can be generated again.
+    With keep_completed, completed sections are kept and returned in the order they were
+    stored (the order their citations were numbered in); otherwise every section is deleted.
+    """
+    stale = db.query(MemoSection).filter(MemoSection.memo_request_id == memo_request_id)
+    if keep_completed:
+        stale = stale.filter(MemoSection.status != "completed")
+    stale.delete(synchronize_session="fetch")
+    db.commit()
+    
+    if not keep_completed:
+        return []
+    return db.query(MemoSection).filter(
+        MemoSection.memo_request_id == memo_request_id,
+        MemoSection.status == "completed"
+    ).order_by(MemoSection.id).all()
+
+def _store_memo_section(
+    db: Session,
+    memo_request_id: int,
+    section_key: str,
+    draft: Callable[[], Tuple[str, List[str]]],
+    label: str = "Section"
+) -> Dict[str, Any]:
+    """
+    Run draft() for a section and record the outcome as a MemoSection row.
+    Database writes stay on the caller's thread, so drafts may run concurrently.
+    """
+    built = _build_memo_section(memo_request_id, section_key, draft, label)
+    _save_memo_sections(db, [built])
+    return built[1]
+
+# Static instructions for every memo section. They live in the system message rather
+# than after the retrieved data so the byte-identical prefix of each request is as long
+# as possible and OpenAI can serve it from its prompt cache; only the company data,
+# section prompt and retrieved context (in that order) vary.
+_SECTION_INSTRUCTIONS = """
+IMPORTANT INSTRUCTIONS:
+1. Base your response ONLY on the data provided in the prompt
+2. When citing information, reference the citation numbers [1], [2], etc.
+3. All CRM data should be cited as "Source: Crunchbase"
+4. Prioritize quantitative data, specific metrics, and statistics
+5. If specific information is not available, clearly state that rather than making assumptions
+6. Include specific numbers, percentages, growth rates, and financial figures when mentioned
+"""
+
+# System message and completion settings shared by every full memo section
+_MEMO_SYSTEM_MESSAGE = """
+You are a venture capital investment analyst at Wyld VC, drafting a data-driven Investment Committee (IC) memo.
+Write in a neutral, factual tone but emphasize analytical insight.
+Always back claims with specific data and citations [1], [2], etc.
+Avoid marketing language or speculation; use quantitative metrics and relative comparisons (e.g., "30% higher than peers").
+Each section must be self-contained, concise (300–500 words), and logically structured for a reader who will skim.
+End each section with a short insight summary (2–3 sentences) highlighting key implications or open questions.
+
+FORMATTING RULES - STRICTLY FOLLOW:
+- Follow the "TITLE FORMATTING RULES" specified in each section's prompt exactly
+- Use ### only for subsection headers (e.g., ### Founder Background)
+- Use **text** for emphasis within paragraphs
+- Do NOT use ## or #### headers
+- For executive_summary and company_snapshot: NO markdown headers at all, only plain paragraphs
+
+You are generating a section of a wider memo, so while you should tie everything together at the end, don't have an explicit conclusion section.
+""" + _SECTION_INSTRUCTIONS
+_MEMO_COMPLETION = {"max_tokens": 2000, "temperature": 0.2}
+_MEMO_TOP_K = 5  # retrieved chunks per full memo section
+
+# Model per full memo section. Sections that mostly restate retrieved facts use the
+# cheaper, faster model; analytical and assessment sections keep the default.
+DEFAULT_SECTION_MODEL = "gpt-4o"
+SECTION_MODEL_MAP = {
+    "company_snapshot": "gpt-4o-mini",
+    "people": "gpt-4o-mini",
+    "traction_validation": "gpt-4o-mini",
+}
+
+def _section_model(section_key: str) -> str:
+    """Model used to generate a full memo section"""
+    return SECTION_MODEL_MAP.get(section_key, DEFAULT_SECTION_MODEL)
+
+# Section prompt shared by full and short memos. Company and CRM data are identical for
+# every section of a memo, so they lead the prompt (right after the fixed system
+# message) to form a shared prefix the API can serve from its prompt cache.
+_SECTION_PROMPT_TEMPLATE = """{company_header}{prompt}
+
+=== RELEVANT RESEARCH & DATA (Retrieved via semantic search) ===
+{context}
+
+SOURCES USED: {source_count} unique sources found
+"""
+
+def _context_token_budget(system_message: str, company_header: str, prompt: str, max_tokens: int) -> int:
+    """
+    Tokens allowed for retrieved context: what is left of the context window once the rest
+    of the prompt and the completion are counted, capped at MEMO_CONTEXT_TOKEN_BUDGET
+    """
+    fixed = count_tokens(system_message) + count_tokens(company_header) + count_tokens(prompt)
+    return min(MEMO_CONTEXT_TOKEN_BUDGET, MEMO_CONTEXT_WINDOW - max_tokens - _PROMPT_OVERHEAD_TOKENS - fixed)
+
+def _prepare_memo_section(
     section_key: str,
     prompt: str,
     company_data: Dict[str, Any],
     faiss_index,
     chunks: List[Dict[str, Any]],
-    db: Session,
-    memo_request_id: int
-) -> Dict[str, Any]:
-    """Generate a single short memo section using RAG and GPT with strict length constraints"""
+    query_embedding=None,
+    company_header: Optional[str] = None,
+    relevant_chunks: Optional[List[Dict[str, Any]]] = None
+) -> Tuple[str, List[str]]:
+    """
+    Retrieve RAG context for a memo section and build its prompt; returns (prompt, sources).
+    query_embedding, if given, is the precomputed embedding of the section's search query;
+    relevant_chunks, if given, are the section's already retrieved chunks;
+    company_header, if given, is format_company_header(company_data) computed once per memo.
+    """
+    
+    if company_header is None:
+        company_header = format_company_header(company_data)
     
+    # Retrieve relevant context using RAG
+    rag_context = retrieve_context_for_section(
+        section_key,
+        prompt,
+        faiss_index,
+        chunks,
+        company_data.get("company_name", ""),
+        top_k=_MEMO_TOP_K,
+        query_embedding=query_embedding,
+        max_context_tokens=_context_token_budget(
+            _MEMO_SYSTEM_MESSAGE, company_header, prompt, _MEMO_COMPLETION["max_tokens"]
+        ),
+        relevant_chunks=relevant_chunks
+    )
+    
+    # Create enhanced prompt with RAG context
+    enhanced_prompt = _SECTION_PROMPT_TEMPLATE.format(
+        company_header=company_header,
+        prompt=prompt,
+        context=rag_context['context'],
+        source_count=len(rag_context['sources'])
+    )
+    
+    # Add Crunchbase to sources if Affinity data was used
+    sources = rag_context['sources'].copy()
+    if company_data.get("affinity_data"):
+        sources.append("Crunchbase (via Affinity CRM)")
+    
+    return enhanced_prompt, sources
+
+def _draft_memo_section(
+    section_key: str,
+    prompt: str,
+    company_data: Dict[str, Any],
+    faiss_index,
+    chunks: List[Dict[str, Any]]
+) -> Tuple[str, List[str]]:
+    """Retrieve context and generate a memo section's content; returns (content, sources) without touching the database"""
+    
+    logger.info("Generating section: %s", section_key)
+    
+    enhanced_prompt, sources = _prepare_memo_section(section_key, prompt, company_data, faiss_index, chunks)
+    
+    # Generate content using GPT
+    content = generate_text(
+        enhanced_prompt, _MEMO_SYSTEM_MESSAGE, model=_section_model(section_key), **_MEMO_COMPLETION
+    )
+    
+    return content, sources
+
+def _section_cache_key(section_key: str, enhanced_prompt: str) -> str:
+    """Hash everything that determines a full memo section's completion."""
+    payload = json.dumps(
+        [section_key, _section_model(section_key), _MEMO_COMPLETION, _MEMO_SYSTEM_MESSAGE, enhanced_prompt],
+        sort_keys=True
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def _cache_memo_sections(db: Session, entries: List[MemoSectionCache], replace: bool = False) -> None:
+    """
+    Remember generated sections so identical prompts are not sent to the model again.
+    Each row is inserted in its own savepoint, so a key that another memo cached first
+    only skips that row. With replace, an existing row for the same key is overwritten
+    (used when a memo is regenerated on purpose). Caching is best effort: other
+    database errors are logged.
+    """
+    if not entries:
+        return
     try:
-        print(f"Generating short memo section: {section_key}")
-        
-        # Retrieve relevant context using RAG (fewer chunks for short memo)
-        rag_context = retrieve_context_for_section(
-            section_key,
-            prompt,
-            faiss_index,
-            chunks,
-            company_data.get("company_name", ""),
-            top_k=3  # Reduced from 8 for shorter context
-        )
-        
-        # Format Affinity data
-        affinity_section = format_affinity_data(company_data.get("affinity_data", {}))
-        
-        company_name = company_data.get("company_name", "the company")
-        company_description = company_data.get("company_description", "")
-        
-        # Create enhanced prompt with RAG context
-        enhanced_prompt = f"""
+        for entry in entries:
+            try:
+                with db.begin_nested():
+                    if replace:
+                        db.query(MemoSectionCache).filter(
+                            MemoSectionCache.cache_key == entry.cache_key
+                        ).delete(synchronize_session=False)
+                    db.add(entry)
+            except IntegrityError:
+                logger.debug("Section '%s' was already cached by another memo", entry.section_name)
+        db.commit()
+    except SQLAlchemyError:
+        db.rollback()
+        logger.exception("❌ Could not cache generated memo sections")
 
-COMPANY: {company_name}
-{f"DESCRIPTION: {company_description}" if company_description else ""}
+def _complete_section(
+    enhanced_prompt: str,
+    system_message: str,
+    cancel_event: Optional[threading.Event] = None,
+    **completion
+) -> str:
+    """
+    Generate a section's text. With a cancel_event the completion is streamed and
+    abandoned as soon as the event is set, so a cancelled memo stops using tokens.
+    """
+    if cancel_event is None:
+        return generate_text(enhanced_prompt, system_message, **completion)
+    
+    if cancel_event.is_set():
+        raise Exception("Generation cancelled")
+    
+    parts = []
+    stream = generate_text(enhanced_prompt, system_message, stream=True, **completion)
+    try:
+        for delta in stream:
+            if cancel_event.is_set():
+                raise Exception("Generation cancelled")
+            parts.append(delta)
+    finally:
+        stream.close()
+    return "".join(parts).strip()
 
-{prompt}
+def is_memo_generating(memo_request_id: int) -> bool:
+    """
+    True while this process is generating the full memo. The stored status can't be
+    trusted for this, since a crashed or restarted run leaves it at "in_progress".
+    """
+    return memo_request_id in _CANCEL_EVENTS
 
-=== CRM DATA (Source: Crunchbase) ===
-{affinity_section}
+def cancel_memo_generation(memo_request_id: int) -> bool:
+    """
+    Ask a running full memo generation to stop. Returns False if the memo is not being
+    generated by this process. Sections that already finished are still saved.
+    """
+    cancel_event = _CANCEL_EVENTS.get(memo_request_id)
+    if cancel_event is None:
+        return False
+    cancel_event.set()
+    return True
 
-=== RELEVANT RESEARCH & DATA (Retrieved via semantic search) ===
-{rag_context['context']}
+def _draft_memo_sections(
+    section_prompts: List[Tuple[str, str]],
+    company_data: Dict[str, Any],
+    faiss_index,
+    chunks: List[Dict[str, Any]],
+    db: Session,
+    cancel_event: Optional[threading.Event] = None,
+    use_cache: bool = True
+) -> List[Tuple[str, Callable[[], Tuple[str, List[str]]], Optional[str], bool]]:
+    """
+    Draft all sections of a full memo.
+    Prompts are built concurrently; sections whose exact prompt was generated before are
+    served from memo_section_cache, and the rest go through the Batch API (if enabled)
+    or concurrent direct completions.
+    Returns (section_key, draft, cache_key, cache_hit) in section order, where draft()
+    returns (content, sources) or raises. Only the caller's thread touches db.
+    Setting cancel_event stops the direct completions that are still running.
+    use_cache=False skips the cache lookup so every section goes to the model.
+    """
+    # Embed every section's search query in a single API call
+    try:
+        query_embeddings = embed_section_queries(section_prompts, company_data.get("company_name", ""))
+    except Exception as e:
+        logger.warning("⚠️ Batch query embedding failed, embedding per section: %s", e)
+        query_embeddings = {}
+    
+    # ...and search the index for all of them together
+    try:
+        section_chunks = retrieve_chunks_for_sections(query_embeddings, faiss_index, chunks, top_k=_MEMO_TOP_K)
+    except Exception as e:
+        logger.warning("⚠️ Batch retrieval failed, searching per section: %s", e)
+        section_chunks = {}
+    
+    # The company/CRM block is the same for every section, so it is formatted once
+    company_header = format_company_header(company_data)
+    
+    # Prompt building (and any per-section retrieval left) runs concurrently
+    prepared = [
+        (section_key, _SECTION_POOL.submit(
+            _prepare_memo_section, section_key, prompt, company_data, faiss_index, chunks,
+            query_embeddings.get(section_key), company_header, section_chunks.get(section_key)
+        ))
+        for section_key, prompt in section_prompts
+    ]
+    
+    enhanced_prompts = {}
+    section_sources = {}
+    for section_key, future in prepared:
+        try:
+            enhanced_prompts[section_key], section_sources[section_key] = future.result()
+        except Exception:
+            # Surfaced again (and recorded as failed) when the draft is stored
+            pass
+    
+    cache_keys = {
+        section_key: _section_cache_key(section_key, enhanced_prompt)
+        for section_key, enhanced_prompt in enhanced_prompts.items()
+    }
+    
+    # Exact-match cache lookup for all sections in one query
+    contents = {}
+    if MEMO_SECTION_CACHE and use_cache and cache_keys:
+        cached_rows = db.query(MemoSectionCache.cache_key, MemoSectionCache.content).filter(
+            MemoSectionCache.cache_key.in_(list(cache_keys.values()))
+        ).all()
+        cached_by_key = dict(cached_rows)
+        for section_key, cache_key in cache_keys.items():
+            if cache_key in cached_by_key:
+                contents[section_key] = cached_by_key[cache_key]
+        if contents:
+            logger.info("♻️ %d section(s) served from cache", len(contents))
+    cache_hits = set(contents)
+    
+    to_generate = {
+        section_key: enhanced_prompt
+        for section_key, enhanced_prompt in enhanced_prompts.items()
+        if section_key not in contents
+    }
+    
+    if MEMO_USE_BATCH_API and to_generate:
+        try:
+            logger.info("Submitting %d sections to the OpenAI Batch API...", len(to_generate))
+            contents.update(generate_text_batch(
+                to_generate,
+                _MEMO_SYSTEM_MESSAGE,
+                poll_interval=MEMO_BATCH_POLL_INTERVAL,
+                timeout=MEMO_BATCH_TIMEOUT,
+                models={section_key: _section_model(section_key) for section_key in to_generate},
+                model=DEFAULT_SECTION_MODEL,
+                **_MEMO_COMPLETION
+            ))
+        except Exception as e:
+            logger.warning("⚠️ Batch generation failed, generating sections directly: %s", e)
+    
+    # Regular (concurrent) completions for everything not cached or returned by the batch
+    pending = {
+        section_key: _SECTION_POOL.submit(
+            _complete_section, enhanced_prompt, _MEMO_SYSTEM_MESSAGE, cancel_event,
+            model=_section_model(section_key), **_MEMO_COMPLETION
+        )
+        for section_key, enhanced_prompt in to_generate.items()
+        if section_key not in contents
+    }
+    
+    def draft_for(section_key: str, future) -> Callable[[], Tuple[str, List[str]]]:
+        def draft() -> Tuple[str, List[str]]:
+            if section_key not in enhanced_prompts:
+                return future.result()  # re-raises the preparation error
+            if section_key in contents:
+                return contents[section_key], section_sources[section_key]
+            return pending[section_key].result(), section_sources[section_key]
+        return draft
+    
+    return [
+        (section_key, draft_for(section_key, future), cache_keys.get(section_key), section_key in cache_hits)
+        for section_key, future in prepared
+    ]
 
-IMPORTANT INSTRUCTIONS:
-1. Base your response ONLY on the data provided above
-2. When citing information, reference the citation numbers [1], [2], etc.
-3. All CRM data should be cited as "Source: Crunchbase"
-4. Prioritize quantitative data, specific metrics, and statistics
-5. If specific information is not available, clearly state that rather than making assumptions
-6. Include specific numbers, percentages, growth rates, and financial figures when mentioned
+def generate_memo_section_with_rag(
+    section_key: str,
+    prompt: str,
+    company_data: Dict[str, Any],
+    faiss_index,
+    chunks: List[Dict[str, Any]],
+    db: Session,
+    memo_request_id: int
+) -> Dict[str, Any]:
+    """Generate a single memo section using RAG and GPT"""
+    
+    return _store_memo_section(
+        db,
+        memo_request_id,
+        section_key,
+        lambda: _draft_memo_section(section_key, prompt, company_data, faiss_index, chunks),
+        label="Section"
+    )
 
-SOURCES USED: {len(rag_context['sources'])} unique sources found
-"""
-        
-        # Generate content using GPT with short memo constraints
-        system_message = """
+# System message for short memo sections (static prefix, see _SECTION_INSTRUCTIONS)
+_SHORT_MEMO_SYSTEM_MESSAGE = """
 You are a venture capital investment analyst at Wyld VC, drafting a concise 1-page investment memo.
 Write in a neutral, factual tone with extreme brevity.
 Use bullet points and short paragraphs. Do NOT include titles, headers, or subheadings.
@@ -244,145 +573,225 @@ Write exactly one short paragraph (40–100 words) as plain text.
 Do NOT include any titles, headers, company names, or section labels. 
 Begin directly with the content. Example:\n
 \"Addresses inefficiencies in...\" not \"Problem: The company...\".
-"""
-        
-        content = generate_text(
-            enhanced_prompt,
-            system_message,
-            model="gpt-4-turbo-preview",
-            max_tokens=125,  # Much lower for short memo sections
-            temperature=0.2
-        )
-        
-        # Add Crunchbase to sources if Affinity data was used
-        sources = rag_context['sources'].copy()
-        if company_data.get("affinity_data"):
-            sources.append("Crunchbase (via Affinity CRM)")
-        
-        # Store the section with source information
-        memo_section = MemoSection(
-            memo_request_id=memo_request_id,
-            section_name=section_key,
-            content=content,
-            data_sources=sources,  # Include Crunchbase
-            status="completed"
-        )
-        
-        db.add(memo_section)
-        db.commit()
-        db.refresh(memo_section)
-        
-        print(f"✅ Short memo section '{section_key}' generated successfully with {len(sources)} sources")
-        
-        return {
-            "status": "success",
-            "section_name": section_key,
-            "section_id": memo_section.id,
-            "content": content,
-            "data_sources_used": sources,
-        }
-        
-    except Exception as e:
-        print(f"❌ Error generating short memo section '{section_key}': {str(e)}")
-        
-        memo_section = MemoSection(
-            memo_request_id=memo_request_id,
-            section_name=section_key,
-            content="",
-            status="failed",
-            error_log=str(e)
-        )
-        db.add(memo_section)
-        db.commit()
-        
-        return {
-            "status": "failed",
-            "section_name": section_key,
-            "error": str(e)
-        }
+""" + _SECTION_INSTRUCTIONS
+# Short memo sections are a single paragraph, so far fewer output tokens are allowed
+_SHORT_MEMO_COMPLETION = {"model": "gpt-4o", "max_tokens": 125, "temperature": 0.2}
 
-def generate_comprehensive_memo(
+def _draft_short_memo_section(
+    section_key: str,
+    prompt: str,
     company_data: Dict[str, Any],
-    db: Session,
-    memo_request_id: int
-) -> Dict[str, Any]:
-    """Generate all memo sections systematically using RAG, maintaining global citations"""
+    faiss_index,
+    chunks: List[Dict[str, Any]],
+    company_header: Optional[str] = None
+) -> Tuple[str, List[str]]:
+    """Retrieve context and generate a short memo section's content; returns (content, sources) without touching the database"""
     
-    print(f"Starting comprehensive memo generation for memo request {memo_request_id}")
+    logger.info("Generating short memo section: %s", section_key)
     
-    # === GLOBAL CITATION MAP ===
-    global_citation_map = {}
-    next_citation_num = 1
+    if company_header is None:
+        company_header = format_company_header(company_data)
     
-    # === BUILD KNOWLEDGE BASE ===
-    print("Building knowledge base with embeddings...")
-    faiss_index, chunks = build_company_knowledge_base(db, company_data.get("source_id"))
+    # Retrieve relevant context using RAG (fewer chunks for short memo)
+    rag_context = retrieve_context_for_section(
+        section_key,
+        prompt,
+        faiss_index,
+        chunks,
+        company_data.get("company_name", ""),
+        top_k=3,  # Reduced from 8 for shorter context
+        max_context_tokens=_context_token_budget(
+            _SHORT_MEMO_SYSTEM_MESSAGE, company_header, prompt, _SHORT_MEMO_COMPLETION["max_tokens"]
+        )
+    )
     
-    if not faiss_index:
-        return {
-            "status": "failed",
-            "error": "Failed to build knowledge base from company data",
-            "sections_completed": [],
-            "sections_failed": []
-        }
+    # Create enhanced prompt with RAG context
+    enhanced_prompt = _SECTION_PROMPT_TEMPLATE.format(
+        company_header=company_header,
+        prompt=prompt,
+        context=rag_context['context'],
+        source_count=len(rag_context['sources'])
+    )
     
-    print(f"✅ Knowledge base built with {len(chunks)} chunks")
+    # Generate content using GPT with short memo constraints
+    content = generate_text(
+        enhanced_prompt,
+        _SHORT_MEMO_SYSTEM_MESSAGE,
+        **_SHORT_MEMO_COMPLETION
+    )
     
-    # === LOAD PROMPTS ===
-    try:
-        prompts = load_memo_prompts()
-    except Exception as e:
-        return {
-            "status": "failed",
-            "error": f"Failed to load memo prompts: {str(e)}",
-            "sections_completed": [],
-            "sections_failed": []
-        }
+    # Add Crunchbase to sources if Affinity data was used
+    sources = rag_context['sources'].copy()
+    if company_data.get("affinity_data"):
+        sources.append("Crunchbase (via Affinity CRM)")
     
-    results = {
-        "status": "in_progress",
-        "total_sections": 0,
-        "sections_completed": [],
-        "sections_failed": [],
-        "generation_summary": {}
-    }
+    return content, sources
+
+def generate_short_memo_section_with_rag(
+    section_key: str,
+    prompt: str,
+    company_data: Dict[str, Any],
+    faiss_index,
+    chunks: List[Dict[str, Any]],
+    db: Session,
+    memo_request_id: int
+) -> Dict[str, Any]:
+    """Generate a single short memo section using RAG and GPT with strict length constraints"""
     
-    # === SECTION LISTS ===
-    main_sections = [
-        "executive_summary",
-        "company_snapshot", 
-        "people",
-        "market_opportunity",
-        "competitive_landscape",
-        "product",
-        "financial",
-        "traction_validation",
-        "deal_considerations"
-    ]
+    return _store_memo_section(
+        db,
+        memo_request_id,
+        section_key,
+        lambda: _draft_short_memo_section(section_key, prompt, company_data, faiss_index, chunks),
+        label="Short memo section"
+    )
+
+def generate_comprehensive_memo(
+    company_data: Dict[str, Any],
+    db: Session,
+    memo_request_id: int,
+    force: bool = False
+) -> Dict[str, Any]:
+    """
+    Generate all memo sections systematically using RAG, maintaining global citations.
+    Sections completed by a previous run of the same memo request are kept and only the
+    missing or failed ones are generated; force=True regenerates every section, bypassing
+    the section cache (the new results replace the cached ones).
+    """
     
-    assessment_sections = [
-        ("assessment_people", "people"),
-        ("assessment_market_opportunity", "market_opportunity"),
-        ("assessment_product", "product"),
-        ("assessment_financials", "financials"),
-        ("assessment_traction_validation", "traction_validation"),
-        ("assessment_deal_considerations", "deal_considerations")
-    ]
+    logger.info("Starting comprehensive memo generation for memo request %s", memo_request_id)
     
-    # === PROCESS MAIN SECTIONS ===
-    for section in main_sections:
-        if section in prompts:
-            result = generate_memo_section_with_rag(
-                section,
-                prompts[section],
-                company_data,
-                faiss_index,
-                chunks,
-                db,
-                memo_request_id
-            )
+    # Registered before the (slow) knowledge base build so a cancel request is honoured
+    # at any point; the flag stays registered until every section has been collected
+    cancel_event = threading.Event()
+    _CANCEL_EVENTS[memo_request_id] = cancel_event
+    try:
+        # === GLOBAL CITATION MAP ===
+        global_citation_map = {}
+        next_citation_num = 1
+        
+        # === BUILD KNOWLEDGE BASE ===
+        logger.info("Building knowledge base with embeddings...")
+        faiss_index, chunks = build_company_knowledge_base(db, company_data.get("source_id"))
+        
+        if not faiss_index:
+            return {
+                "status": "failed",
+                "error": "Failed to build knowledge base from company data",
+                "sections_completed": [],
+                "sections_failed": []
+            }
+        
+        logger.info("✅ Knowledge base built with %d chunks", len(chunks))
+        
+        # === LOAD PROMPTS ===
+        try:
+            prompts = load_memo_prompts()
+        except Exception as e:
+            return {
+                "status": "failed",
+                "error": f"Failed to load memo prompts: {str(e)}",
+                "sections_completed": [],
+                "sections_failed": []
+            }
+        
+        results = {
+            "status": "in_progress",
+            "total_sections": 0,
+            "sections_completed": [],
+            "sections_failed": [],
+            "generation_summary": {}
+        }
+        
+        # === SECTION LISTS ===
+        main_sections = [
+            "executive_summary",
+            "company_snapshot", 
+            "people",
+            "market_opportunity",
+            "competitive_landscape",
+            "product",
+            "financial",
+            "traction_validation",
+            "deal_considerations"
+        ]
+        
+        assessment_sections = [
+            ("assessment_people", "people"),
+            ("assessment_market_opportunity", "market_opportunity"),
+            ("assessment_product", "product"),
+            ("assessment_financials", "financials"),
+            ("assessment_traction_validation", "traction_validation"),
+            ("assessment_deal_considerations", "deal_considerations")
+        ]
+        
+        # === COLLECT SECTION PROMPTS ===
+        section_prompts = []
+        for section in main_sections:
+            if section in prompts:
+                section_prompts.append((section, prompts[section]))
+            else:
+                logger.warning("⚠️ Prompt not found for section: %s", section)
+        
+        for assessment_key, prompt_key in assessment_sections:
+            if "assessment_summary" in prompts and prompt_key in prompts["assessment_summary"]:
+                section_prompts.append((assessment_key, prompts["assessment_summary"][prompt_key]))
+            else:
+                logger.warning("⚠️ Assessment prompt not found for: %s", assessment_key)
+        
+        # === RESUME FROM A PREVIOUS RUN ===
+        # Completed sections already carry globally numbered citations, so their sources
+        # are replayed into the citation map before any new section is numbered
+        for memo_section in _reset_memo_sections(db, memo_request_id, keep_completed=not force):
+            sources = memo_section.data_sources or []
+            for source in sources:
+                if source not in global_citation_map:
+                    global_citation_map[source] = next_citation_num
+                    next_citation_num += 1
+            results["sections_completed"].append({
+                "status": "success",
+                "section_name": memo_section.section_name,
+                "section_id": memo_section.id,
+                "content": memo_section.content,
+                "data_sources_used": sources,
+                "resumed": True
+            })
+        
+        resumed = {result["section_name"] for result in results["sections_completed"]}
+        if resumed:
+            logger.info("♻️ Keeping %d section(s) from the previous run", len(resumed))
+            section_prompts = [
+                (section_key, prompt) for section_key, prompt in section_prompts
+                if section_key not in resumed
+            ]
+        
+        # === DRAFT ALL SECTIONS CONCURRENTLY ===
+        # Each draft is dominated by OpenAI latency, so the sections are generated in
+        # parallel; results are stored and citations remapped below in section order.
+        # A cancel that arrived while the knowledge base was being built skips drafting
+        drafts = [] if cancel_event.is_set() else _draft_memo_sections(
+            section_prompts, company_data, faiss_index, chunks, db, cancel_event, use_cache=not force
+        )
+        
+        # === REMAP CITATIONS AND STORE SECTIONS ===
+        built_sections = []
+        cache_entries = []
+        for section_key, draft, cache_key, cache_hit in drafts:
+            memo_section, result = _build_memo_section(memo_request_id, section_key, draft)
+            built_sections.append((memo_section, result))
             
             if result["status"] == "success":
+                result["model"] = _section_model(section_key)
+                result["cache_hit"] = cache_hit
+                if MEMO_SECTION_CACHE and cache_key and not cache_hit:
+                    cache_entries.append(MemoSectionCache(
+                        cache_key=cache_key,
+                        section_name=section_key,
+                        model=_section_model(section_key),
+                        content=result["content"],
+                        data_sources=result["data_sources_used"]
+                    ))
+                
                 # ---- GLOBAL CITATION REMAPPING ----
                 section_text = result["content"]
                 section_sources = result.get("data_sources_used", [])
@@ -399,98 +808,51 @@ def generate_comprehensive_memo(
                         section_text
                     )
                 
-                # Update stored section content in DB
-                section_obj = db.query(MemoSection).filter(MemoSection.id == result["section_id"]).first()
-                if section_obj:
-                    section_obj.content = section_text
-                    db.commit()
-                
-                results["sections_completed"].append(result)
-            else:
-                results["sections_failed"].append(result)
-        else:
-            print(f"⚠️ Prompt not found for section: {section}")
-    
-    # === PROCESS ASSESSMENT SECTIONS ===
-    for assessment_key, prompt_key in assessment_sections:
-        if "assessment_summary" in prompts and prompt_key in prompts["assessment_summary"]:
-            result = generate_memo_section_with_rag(
-                assessment_key,
-                prompts["assessment_summary"][prompt_key],
-                company_data,
-                faiss_index,
-                chunks,
-                db,
-                memo_request_id
-            )
-            
-            if result["status"] == "success":
-                section_text = result["content"]
-                section_sources = result.get("data_sources_used", [])
-                
-                for local_idx, source in enumerate(section_sources, 1):
-                    if source not in global_citation_map:
-                        global_citation_map[source] = next_citation_num
-                        next_citation_num += 1
-                    
-                    section_text = re.sub(
-                        rf'\[{local_idx}\]',
-                        f'[{global_citation_map[source]}]',
-                        section_text
-                    )
-                
-                section_obj = db.query(MemoSection).filter(MemoSection.id == result["section_id"]).first()
-                if section_obj:
-                    section_obj.content = section_text
-                    db.commit()
+                # Stored with the remapped citations
+                memo_section.content = section_text
                 
                 results["sections_completed"].append(result)
             else:
                 results["sections_failed"].append(result)
+        
+        # All section rows go in with a single commit; cache rows follow in their own
+        # transaction so a cache key conflict cannot roll back the memo
+        _save_memo_sections(db, built_sections)
+        _cache_memo_sections(db, cache_entries, replace=force)
+        
+        # === FINALIZE ===
+        results["total_sections"] = len(results["sections_completed"]) + len(results["sections_failed"])
+        results["success_rate"] = (
+            len(results["sections_completed"]) / results["total_sections"]
+            if results["total_sections"] > 0 else 0
+        )
+        
+        if cancel_event.is_set():
+            results["status"] = "cancelled"
+        elif len(results["sections_failed"]) == 0:
+            results["status"] = "completed"
+        elif len(results["sections_completed"]) > 0:
+            results["status"] = "partial_success"
         else:
-            print(f"⚠️ Assessment prompt not found for: {assessment_key}")
-    
-    # === FINALIZE ===
-    results["total_sections"] = len(results["sections_completed"]) + len(results["sections_failed"])
-    results["success_rate"] = (
-        len(results["sections_completed"]) / results["total_sections"]
-        if results["total_sections"] > 0 else 0
-    )
-    
-    if len(results["sections_failed"]) == 0:
-        results["status"] = "completed"
-    elif len(results["sections_completed"]) > 0:
-        results["status"] = "partial_success"
-    else:
-        results["status"] = "failed"
-    
-    results["generation_summary"] = {
-        "total_sections": results["total_sections"],
-        "successful": len(results["sections_completed"]),
-        "failed": len(results["sections_failed"]),
-        "success_rate": f"{results['success_rate']*100:.1f}%"
-    }
-    
-    print(f"Memo generation completed: {results['success_rate']*100:.1f}% success rate")
-    print(f"📚 Global citation count: {len(global_citation_map)} sources mapped up to [{next_citation_num - 1}]")
-    
-    return results
+            results["status"] = "failed"
+        
+        results["generation_summary"] = {
+            "total_sections": results["total_sections"],
+            "successful": len(results["sections_completed"]),
+            "failed": len(results["sections_failed"]),
+            "success_rate": f"{results['success_rate']*100:.1f}%"
+        }
+        
+        logger.info("Memo generation completed: %.1f%% success rate", results["success_rate"] * 100)
+        logger.info("📚 Global citation count: %d sources mapped up to [%d]", len(global_citation_map), next_citation_num - 1)
+        
+        return results
+    finally:
+        _CANCEL_EVENTS.pop(memo_request_id, None)
 
 def compile_final_memo(db: Session, memo_request_id: int) -> str:
     """Compile all completed sections into a final memo with global citations"""
 
-    # Fetch completed sections for this memo
-    sections = db.query(MemoSection).filter(
-        MemoSection.memo_request_id == memo_request_id,
-        MemoSection.status == "completed"
-    ).all()
-
-    if not sections:
-        return "No completed sections found for this memo."
-
-    memo_parts = []
-    all_sources = set()
-
     # Define logical display order
     section_order = [
         "executive_summary", "company_snapshot", "people",
@@ -501,33 +863,57 @@ def compile_final_memo(db: Session, memo_request_id: int) -> str:
         "assessment_traction_validation", "assessment_deal_considerations"
     ]
 
+    # Fetch completed sections for this memo (only the ones that are displayed, and
+    # only the columns used below, so no ORM objects are built)
+    sections = db.query(
+        MemoSection.section_name,
+        MemoSection.content,
+        MemoSection.data_sources
+    ).filter(
+        MemoSection.memo_request_id == memo_request_id,
+        MemoSection.status == "completed",
+        MemoSection.section_name.in_(section_order)
+    ).order_by(MemoSection.id).all()
+
+    if not sections:
+        return "No completed sections found for this memo."
+
+    # Index by name once; the first row wins if a section was stored more than once
+    sections_by_name = {}
+    for section in sections:
+        sections_by_name.setdefault(section.section_name, section)
+
+    memo_parts = []
+
     # Build body of the memo
     for section_name in section_order:
-        section = next((s for s in sections if s.section_name == section_name), None)
+        section = sections_by_name.get(section_name)
         if section and section.content:
             title = section_name.replace("_", " ").title()
             memo_parts.append(f"## {title}\n\n{section.content.strip()}")
-            if section.data_sources:
-                all_sources.update(section.data_sources)
+
+    all_sources = {
+        source
+        for section in sections_by_name.values()
+        if section.content and section.data_sources
+        for source in section.data_sources
+    }
 
     # Build Sources section
     if all_sources:
         memo_parts.append("\n## Sources\n")
         # Sort alphabetically for consistent order
-        sorted_sources = sorted(list(all_sources))
+        sorted_sources = sorted(all_sources)
         for idx, source in enumerate(sorted_sources, 1):
             memo_parts.append(f"[{idx}] {source}")
 
     return "\n\n".join(memo_parts)
 
 def load_short_memo_prompts() -> Dict[str, Any]:
-    """Load short memo prompts from JSON file"""
-    prompts_path = os.path.join(os.path.dirname(__file__), '..', 'schemas', 'memo_prompts.json')
-    with open(prompts_path, 'r') as f:
-        data = json.load(f)
-        short_memo_prompts = data.get("short_memo", {})
-        print(f"Loaded short memo prompts: {list(short_memo_prompts.keys())}")
-        return short_memo_prompts
+    """Load short memo prompts from JSON file (shares load_memo_prompts' cached copy)"""
+    short_memo_prompts = load_memo_prompts().get("short_memo", {})
+    logger.debug("Loaded short memo prompts: %s", list(short_memo_prompts))
+    return short_memo_prompts
 
 def generate_short_memo(
     company_data: Dict[str, Any],
@@ -575,38 +961,47 @@ def generate_short_memo(
             "generation_summary": {}
         }
         
-        # Generate each section using the new short memo function
+        # Draft all sections concurrently (see generate_comprehensive_memo), then
+        # collect them in section order on this thread
+        company_header = format_company_header(company_data)
+        drafts = []
         for section_name in short_sections:
+            prompt = short_prompts.get(section_name, f"Generate content for {section_name}")
+            logger.debug("Using prompt for %s: %.50s...", section_name, prompt)
+            drafts.append((section_name, _SECTION_POOL.submit(
+                _draft_short_memo_section, section_name, prompt, company_data, faiss_index, chunks,
+                company_header
+            )))
+        
+        built_sections = []
+        for section_name, draft in drafts:
             try:
-                prompt = short_prompts.get(section_name, f"Generate content for {section_name}")
-                print(f"Using prompt for {section_name}: {prompt[:50]}...")
-                
-                # Use the new short memo section generation function
-                section_result = generate_short_memo_section_with_rag(
+                memo_section, section_result = _build_memo_section(
+                    memo_request_id,
                     section_name,
-                    prompt,
-                    company_data,
-                    faiss_index,
-                    chunks,
-                    db,
-                    memo_request_id
+                    draft.result,
+                    label="Short memo section"
                 )
+                built_sections.append((memo_section, section_result))
                 
                 if section_result["status"] == "success":
-                    print(f"✅ Generated short memo section '{section_name}' successfully")
+                    logger.info("✅ Generated short memo section '%s' successfully", section_name)
                     results["sections_completed"].append(section_result)
                 else:
-                    print(f"❌ Failed to generate section '{section_name}': {section_result.get('error', 'Unknown error')}")
+                    logger.error("❌ Failed to generate section '%s': %s", section_name, section_result.get('error', 'Unknown error'))
                     results["sections_failed"].append(section_result)
                 
             except Exception as e:
-                print(f"❌ Error generating {section_name}: {str(e)}")
+                logger.error("❌ Error generating %s: %s", section_name, e)
                 results["sections_failed"].append({
                     "status": "failed",
                     "section_name": section_name,
                     "error": str(e)
                 })
         
+        # Save all section rows with a single commit
+        _save_memo_sections(db, built_sections)
+        
         # Update overall status
         results["total_sections"] = len(results["sections_completed"]) + len(results["sections_failed"])
         results["success_rate"] = (
@@ -628,12 +1023,12 @@ def generate_short_memo(
             "success_rate": f"{results['success_rate']*100:.1f}%"
         }
         
-        print(f"Short memo generation completed: {results['success_rate']*100:.1f}% success rate")
+        logger.info("Short memo generation completed: %.1f%% success rate", results["success_rate"] * 100)
         
         return results
         
     except Exception as e:
-        print(f"❌ Error in generate_short_memo: {str(e)}")
+        logger.error("❌ Error in generate_short_memo: %s", e)
         return {
             "status": "failed",
             "sections_completed": [],
@@ -657,22 +1052,22 @@ def compile_short_memo(db: Session, memo_request_id: int) -> str:
         "deal_traction", "competitive_landscape", "remarks"
     ]
     
-    # Create a mapping of section names to content
-    section_map = {section.section_name: section.content for section in sections}
+    # Index by name once (the last row wins if a section was stored more than once)
+    sections_by_name = {section.section_name: section for section in sections}
     
     memo_parts = []
     all_sources = set()
     
     # Add sections in the correct order
     for section_name in section_order:
-        if section_name in section_map:
-            memo_parts.append(section_map[section_name].strip())
-            memo_parts.append(section_map[section_name])
+        section = sections_by_name.get(section_name)
+        if section:
+            memo_parts.append(section.content.strip())
+            memo_parts.append(section.content)
             
             # Collect sources from this section
-            section_obj = next((s for s in sections if s.section_name == section_name), None)
-            if section_obj and section_obj.data_sources:
-                all_sources.update(section_obj.data_sources)
+            if section.data_sources:
+                all_sources.update(section.data_sources)
     
     # Build Sources section
     if all_sources:
@@ -1,13 +1,15 @@
-import os
 import json
 import faiss
 import numpy as np
 from typing import List, Dict, Any, Tuple
-from openai import OpenAI
 from sqlalchemy.orm import Session
 from backend.db.models import Source, DocumentEmbedding
+# Embeddings share the completion client's connection pool (and its HTTP/2 connection)
+from backend.services.gpt_service import client, count_tokens
 
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+# Approximate tokens added around each chunk when it is formatted into the context
+# (citation numbers, category and type header)
+_CHUNK_FORMAT_TOKENS = 20
 
 class RAGService:
     def __init__(self):
@@ -201,25 +203,43 @@ class RAGService:
         query: str,
         index: faiss.Index,
         chunks: List[Dict[str, Any]],
-        top_k: int = 5
+        top_k: int = 5,
+        query_embedding: np.ndarray = None
     ) -> List[Dict[str, Any]]:
-        """Retrieve most relevant chunks for a query"""
+        """Retrieve most relevant chunks for a query (pass query_embedding if it is already embedded)"""
         if index is None or not chunks:
             return []
         
-        query_embedding = self.get_embeddings_batch([query])[0]
-        query_embedding = np.array([query_embedding], dtype=np.float32)
+        if query_embedding is None:
+            query_embedding = self.get_embeddings_batch([query])[0]
+        
+        return self.search_many([query_embedding], index, chunks, top_k)[0]
+    
+    def search_many(
+        self,
+        query_embeddings: List[np.ndarray],
+        index: faiss.Index,
+        chunks: List[Dict[str, Any]],
+        top_k: int = 5
+    ) -> List[List[Dict[str, Any]]]:
+        """Retrieve the most relevant chunks for several query embeddings with one index search"""
+        if index is None or not chunks or not len(query_embeddings):
+            return [[] for _ in query_embeddings]
         
-        distances, indices = index.search(query_embedding, top_k)
+        distances, indices = index.search(np.array(query_embeddings, dtype=np.float32), top_k)
         
-        relevant_chunks = []
-        for idx, distance in zip(indices[0], distances[0]):
-            if idx < len(chunks):
-                chunk = chunks[idx].copy()
-                chunk["similarity_score"] = float(1 / (1 + distance))
-                relevant_chunks.append(chunk)
+        results = []
+        for row_indices, row_distances in zip(indices, distances):
+            relevant_chunks = []
+            for idx, distance in zip(row_indices, row_distances):
+                # FAISS pads with -1 when the index holds fewer than top_k vectors
+                if 0 <= idx < len(chunks):
+                    chunk = chunks[idx].copy()
+                    chunk["similarity_score"] = float(1 / (1 + distance))
+                    relevant_chunks.append(chunk)
+            results.append(relevant_chunks)
         
-        return relevant_chunks
+        return results
     
     def format_context_with_sources(self, relevant_chunks: List[Dict[str, Any]]) -> Dict[str, Any]:
         """Format retrieved context with source attribution and deduplication"""
@@ -293,18 +313,73 @@ def build_company_knowledge_base(db: Session, source_id: int) -> Tuple[faiss.Ind
     
     return index, chunks
 
+def _section_query(section_key: str, section_prompt: str, company_name: str) -> str:
+    """Build the semantic search query for a memo section"""
+    return f"{company_name} {section_key.replace('_', ' ')}: {section_prompt[:200]}"
+
+def embed_section_queries(
+    section_prompts: List[Tuple[str, str]],
+    company_name: str
+) -> Dict[str, np.ndarray]:
+    """Embed the search queries for many (section_key, prompt) pairs in one API call"""
+    if not section_prompts:
+        return {}
+    
+    queries = [
+        _section_query(section_key, section_prompt, company_name)
+        for section_key, section_prompt in section_prompts
+    ]
+    embeddings = rag_service.get_embeddings_batch(queries)
+    return {
+        section_key: embedding
+        for (section_key, _), embedding in zip(section_prompts, embeddings)
+    }
+
+def fit_chunks_to_budget(relevant_chunks: List[Dict[str, Any]], max_tokens: int) -> List[Dict[str, Any]]:
+    """Keep the highest-ranked chunks whose formatted context fits in max_tokens, dropping the rest"""
+    fitted = []
+    used = 0
+    for chunk in relevant_chunks:
+        used += count_tokens(chunk["text"]) + _CHUNK_FORMAT_TOKENS
+        if used > max_tokens:
+            break
+        fitted.append(chunk)
+    return fitted
+
+def retrieve_chunks_for_sections(
+    query_embeddings: Dict[str, np.ndarray],
+    index: faiss.Index,
+    chunks: List[Dict[str, Any]],
+    top_k: int = 8
+) -> Dict[str, List[Dict[str, Any]]]:
+    """Search the index for every section's query embedding at once; returns {section_key: ranked chunks}"""
+    section_keys = list(query_embeddings)
+    results = rag_service.search_many([query_embeddings[key] for key in section_keys], index, chunks, top_k)
+    return dict(zip(section_keys, results))
+
 def retrieve_context_for_section(
     section_key: str,
     section_prompt: str,
     index: faiss.Index,
     chunks: List[Dict[str, Any]],
     company_name: str,
-    top_k: int = 8
+    top_k: int = 8,
+    query_embedding: np.ndarray = None,
+    max_context_tokens: int = None,
+    relevant_chunks: List[Dict[str, Any]] = None
 ) -> Dict[str, Any]:
-    """Retrieve relevant context for a specific memo section"""
+    """
+    Retrieve relevant context for a specific memo section.
+    relevant_chunks, if given, are the section's already retrieved chunks (best first),
+    and the index is not searched again.
+    If max_context_tokens is given, the lowest-ranked chunks are dropped until the context fits.
+    """
     
-    query = f"{company_name} {section_key.replace('_', ' ')}: {section_prompt[:200]}"
-    relevant_chunks = rag_service.retrieve_relevant_context(query, index, chunks, top_k)
+    if relevant_chunks is None:
+        query = _section_query(section_key, section_prompt, company_name)
+        relevant_chunks = rag_service.retrieve_relevant_context(query, index, chunks, top_k, query_embedding)
+    if max_context_tokens is not None:
+        relevant_chunks = fit_chunks_to_budget(relevant_chunks, max_context_tokens)
     formatted_context = rag_service.format_context_with_sources(relevant_chunks)
     
     return formatted_context
\ No newline at end of file
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Test for retrying a memo left "in_progress" by a crashed or restarted run.
+Run from project root: python backend/test_memo_retry.py
+"""
+import sys
+import os
+import asyncio
+import threading
+from pathlib import Path
+
+# Add project root to path so 'backend' imports work
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root))
+
+# backend.database needs a URL at import time; the test uses its own in-memory engine
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from fastapi import BackgroundTasks, HTTPException
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from backend.db.models import Base, User, Source, MemoRequest
+from backend.routes.memo import retry_memo
+from backend.services import memo_generation_service
+
+def _setup_stale_memo():
+    """In-memory database holding a full memo stuck at "in_progress" """
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+
+    user = User(email="test@example.com")
+    db.add(user)
+    db.commit()
+
+    source = Source(user_id=user.id, company_name="Test Company")
+    db.add(source)
+    db.commit()
+
+    memo_request = MemoRequest(
+        user_id=user.id,
+        company_name="Test Company",
+        sources_id=source.id,
+        memo_type="full",
+        status="in_progress",
+        error_log="worker restarted"
+    )
+    db.add(memo_request)
+    db.commit()
+    return db, user, memo_request
+
+def test_retry_stale_in_progress_memo():
+    """A stale "in_progress" memo is retried, one still generating here is rejected"""
+    db, user, memo_request = _setup_stale_memo()
+
+    try:
+        # Nothing is generating this memo in this process, so the retry goes through
+        background_tasks = BackgroundTasks()
+        result = asyncio.run(retry_memo(memo_request.id, background_tasks, False, user, db))
+
+        assert result["status"] == "in_progress"
+        assert len(background_tasks.tasks) == 1
+        db.refresh(memo_request)
+        assert memo_request.status == "in_progress"
+        assert memo_request.error_log is None
+
+        # While this process is generating the memo, a second retry is rejected
+        memo_generation_service._CANCEL_EVENTS[memo_request.id] = threading.Event()
+        try:
+            background_tasks = BackgroundTasks()
+            try:
+                asyncio.run(retry_memo(memo_request.id, background_tasks, False, user, db))
+                raise AssertionError("Expected a 409 while the memo is generating")
+            except HTTPException as e:
+                assert e.status_code == 409
+            assert len(background_tasks.tasks) == 0
+        finally:
+            memo_generation_service._CANCEL_EVENTS.pop(memo_request.id, None)
+
+        print("✅ Stale in_progress memo can be retried")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    print("🧪 Testing memo retry\n")
+    test_retry_stale_in_progress_memo()